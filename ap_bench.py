@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+# ApplyPilot benchmark harness (no network)
+# - Replays recorded provider payloads (applypilot_ux.py --record DIR) or built-in synthetic ones
+# - Scales them to N postings and runs normalize -> dedupe -> geo/date -> filters+score -> sort -> outputs
+# - Reports per-stage wall time, throughput (jobs/s) and, with --memory, tracemalloc peak per stage
+#   plus retained bytes per normalized Job (vs. a plain dict-backed, non-interned dataclass);
+#   the screening sub-stages come from the pipeline's own METRICS instrumentation
+# - --score-parity scores every normalized posting with both compute_score and the vectorized
+#   score_batch, times both and exits 1 if any score differs
+# - --self-check runs small deterministic checks of behaviour the benchmarks rely on (HTTP host
+#   fairness, region filter semantics); exits 1 if any fails
+# - --import-time measures CLI startup in fresh interpreters (python -X importtime): total import
+#   time, wall time and the heaviest top-level imports; exits 1 if a lazily loaded module
+#   (httpx, rich, numpy, pandas, email, ...) is imported by `applypilot_ux.py --help`
+#
+#   python ap_bench.py --scales 1000,10000,100000
+#   python ap_bench.py --fixtures ./fixtures/2026-10-17 --score-parity --scales 1000,100000
+#   python ap_bench.py --fixtures ./fixtures/2026-10-17 --scales 10000 --memory --json bench.json
+#   python ap_bench.py --import-time
+#   python ap_bench.py --self-check
+from __future__ import annotations
+
+import argparse, asyncio, io, json, os, random, statistics, subprocess, sys, tempfile, time, tracemalloc
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass, make_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import applypilot_ux as ap
+
+# Per provider: (id field, company field) rewritten on each replica so scaled rows stay distinct
+REPLICA_FIELDS = {
+    "remotive": ("id", "company_name"),
+    "remoteok": ("id", "company"),
+    "greenhouse": ("id", "_gh_org"),
+    "lever": ("id", "_lever_org"),
+    "smartrecruiters": ("id", "_sr_org"),
+}
+
+# Screening breakdown recorded by ap.METRICS inside apply_filters_and_score
+SUB_STAGES = ("filter_titles", "filter_body_signals", "filter_seniority", "compute_score", "screen_parallel")
+
+_TITLES = ["Sales Engineer", "Senior Solutions Engineer", "Solutions Consultant II", "Customer Engineer",
+           "Systems Engineer", "Technical Account Manager", "Frontend Developer", "Implementation Specialist",
+           "Solutions Architect", "Field Applications Engineer", "Partner Engineer", "Account Executive"]
+_LOCATIONS = ["Remote", "United States", "Australia", "Remote - US", "London, United Kingdom", "Berlin, Germany",
+              "Anywhere", "San Francisco, CA", "EMEA", "Remote (Europe)", "Toronto, Canada", "Singapore"]
+_PARAGRAPHS = [
+    "<p>Run discovery, demos and proofs of concept with prospects alongside account executives.</p>",
+    "<p>Own technical scoping, RFP responses and solution design for enterprise deals.</p>",
+    "<ul><li>REST APIs, webhooks, OAuth/SAML SSO</li><li>Python, SQL, Linux</li><li>AWS, Docker, Kubernetes</li></ul>",
+    "&lt;p&gt;Remote (US) role. Travel up to 20%. Base salary $120,000 - $150,000.&lt;/p&gt;",
+    "<p>Join the on-call rotation and help with incident response for our ticket queue.</p>",
+    "<p>We value documentation, automation and scripting. Our culture is distributed and async.</p>",
+    "<p>Benefits: health, dental, 401k, generous PTO, learning budget and home-office stipend.</p>",
+]
+
+def synthetic_payloads(per_provider: int = 200, seed: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """Provider-shaped raw payloads, as afetch would return them."""
+    rnd = random.Random(seed)
+    def desc() -> str:
+        return "".join(rnd.sample(_PARAGRAPHS, rnd.randint(2, 5))) * rnd.randint(1, 3)
+    def iso(i: int) -> str:
+        return f"2026-{(i % 9) + 1:02d}-{(i % 27) + 1:02d}T12:00:00Z"
+    return {
+        "remotive": [{"id": i, "title": rnd.choice(_TITLES), "company_name": f"Remote Co {i % 40}",
+                      "candidate_required_location": rnd.choice(_LOCATIONS), "url": f"https://remotive.com/job/{i}",
+                      "publication_date": iso(i), "description": desc(), "tags": ["saas", "b2b"], "salary": ""}
+                     for i in range(per_provider)],
+        "remoteok": [{"id": str(10_000 + i), "position": rnd.choice(_TITLES), "company": f"OK Corp {i % 40}",
+                      "location": rnd.choice(_LOCATIONS), "date": iso(i), "description": desc(),
+                      "tags": ["api", "sales"], "slug": f"job-{i}"}
+                     for i in range(per_provider)],
+        "greenhouse": [{"id": 20_000 + i, "title": rnd.choice(_TITLES), "_gh_org": f"board{i % 20}",
+                        "absolute_url": f"https://boards.greenhouse.io/x/jobs/{i}",
+                        "locations": [{"name": rnd.choice(_LOCATIONS)}], "updated_at": iso(i), "content": desc()}
+                       for i in range(per_provider)],
+        "lever": [{"id": f"lv-{i}", "text": rnd.choice(_TITLES), "_lever_org": f"lever{i % 20}",
+                   "hostedUrl": f"https://jobs.lever.co/x/{i}", "categories": {"location": rnd.choice(_LOCATIONS)},
+                   "descriptionPlain": ap.html_to_text(desc()), "createdAt": 1_760_000_000_000 + i * 60_000}
+                  for i in range(per_provider)],
+        "smartrecruiters": [{"id": f"sr-{i}", "name": rnd.choice(_TITLES), "_sr_org": f"sr{i % 20}",
+                             "company": {"name": f"SR Co {i % 40}"}, "releasedDate": iso(i),
+                             "location": {"fullLocation": rnd.choice(_LOCATIONS), "remote": bool(i % 2)},
+                             "function": {"label": "Sales"}, "_sr_description": desc()}
+                            for i in range(per_provider)],
+    }
+
+def load_payloads(fixtures_dir: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
+    if not fixtures_dir:
+        return synthetic_payloads()
+    out = {}
+    for p in ap.PROVIDERS:
+        if ap.fixture_path(fixtures_dir, p.name).exists():
+            out[p.name] = ap.load_fixture(fixtures_dir, p.name)
+    if not out:
+        raise SystemExit(f"No fixtures found in {fixtures_dir}")
+    return out
+
+def iter_scaled(payloads: Dict[str, List[Dict[str, Any]]], n: int, batch: int) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """Lazily cycle each provider's rows up to its share of n, rewriting id/company per replica."""
+    total = sum(len(rows) for rows in payloads.values()) or 1
+    for name, rows in payloads.items():
+        if not rows:
+            continue
+        id_field, company_field = REPLICA_FIELDS.get(name, ("id", None))
+        target = max(1, round(n * len(rows) / total))
+        chunk: List[Dict[str, Any]] = []
+        for k in range(target):
+            r, row = divmod(k, len(rows))
+            row = dict(rows[row])
+            if r:
+                row[id_field] = f"{row.get(id_field)}-{r}"
+                if company_field:
+                    row[company_field] = f"{row.get(company_field) or ''} {r}"
+            chunk.append(row)
+            if len(chunk) >= batch:
+                yield name, chunk
+                chunk = []
+        if chunk:
+            yield name, chunk
+
+# The pre-slots Job layout: per-instance __dict__, every string and list owned by its posting
+LegacyJob = make_dataclass("LegacyJob", [(f.name, f.type) for f in fields(ap.Job)])
+
+def _owned(v: Any) -> Any:
+    if isinstance(v, str):
+        return v.encode("utf-8").decode("utf-8")  # a fresh, un-interned copy
+    if isinstance(v, (list, tuple)):
+        return [_owned(x) for x in v]
+    return v
+
+def legacy_jobs(jobs: List[Any]) -> List[Any]:
+    return [LegacyJob(**{f: _owned(getattr(j, f)) for f in ap.JOB_FIELDS}) for j in jobs]
+
+def deep_bytes(objs: Iterable[Any]) -> int:
+    """sys.getsizeof over everything reachable, each object counted once (shared/interned strings too)."""
+    seen: set = set()
+    stack, total = list(objs), 0
+    while stack:
+        o = stack.pop()
+        if o is None or id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys()); stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif is_dataclass(o):
+            stack.extend(getattr(o, f.name) for f in fields(o))
+            if hasattr(o, "__dict__"):
+                stack.append(o.__dict__)
+    return total
+
+def scale_payloads(payloads: Dict[str, List[Dict[str, Any]]], n: int) -> Dict[str, List[Dict[str, Any]]]:
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    for name, rows in iter_scaled(payloads, n, batch=max(1, n)):
+        out.setdefault(name, []).extend(rows)
+    return out
+
+class StageTimer:
+    def __init__(self, memory: bool):
+        self.memory = memory
+        self.rows: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str, n_in: int) -> Iterator[Dict[str, Any]]:
+        row: Dict[str, Any] = {"stage": name, "in": n_in, "out": None}
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        yield row
+        row["seconds"] = time.perf_counter() - t0
+        row["jobs_per_s"] = (n_in / row["seconds"]) if row["seconds"] > 0 else None
+        if self.memory:
+            row["peak_mb"] = (tracemalloc.get_traced_memory()[1] - base) / 1e6
+        self.rows.append(row)
+
+def run_scale(payloads: Dict[str, List[Dict[str, Any]]], n: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    scaled = scale_payloads(payloads, n)
+    footprint: Optional[Dict[str, Any]] = None
+    providers = {p.name: p for p in ap.PROVIDERS}
+    timer = StageTimer(args.memory)
+    console = ap.PlainConsole(io.StringIO())
+    include = [s.strip() for s in ap.DEFAULT_INCLUDE.split(",")]
+    ap.DESCRIPTIONS = ap.DescriptionStore()
+    ap.METRICS.reset()
+    if args.memory:
+        tracemalloc.start()
+    try:
+        n_raw = sum(len(r) for r in scaled.values())
+        with timer.stage("normalize", n_raw) as st:
+            jobs = [j for name, rows in scaled.items() if name in providers
+                    for j in ap.normalize_jobs(providers[name].to_jobs(rows), args.desc_max)]
+            st["out"] = len(jobs)
+        if args.memory and jobs:
+            footprint = {"stage": "bytes_per_job", "job": deep_bytes(jobs) / len(jobs),
+                         "legacy_job": deep_bytes(legacy_jobs(jobs)) / len(jobs)}
+        with timer.stage("dedupe", len(jobs)) as st:
+            jobs = ap.dedupe(jobs, fuzzy=not args.no_fuzzy_dedupe); st["out"] = len(jobs)
+        with timer.stage("geo_recency", len(jobs)) as st:
+            jobs = ap.filter_geography_and_recency(jobs, include, [], args.days or None); st["out"] = len(jobs)
+        with timer.stage("filters_score", len(jobs)) as st:
+            jobs = ap.apply_filters_and_score(jobs, args.min_score, args.loose, args.strict, console, workers=args.workers)
+            st["out"] = len(jobs)
+        for sub in SUB_STAGES:
+            m = ap.METRICS.stages.get(sub)
+            if m:
+                timer.rows.append({"stage": f"  {sub}", "in": m["in"], "out": m["out"], "seconds": m["wall_s"],
+                                   "jobs_per_s": m["in"] / m["wall_s"] if m["wall_s"] else None, "sub": True})
+        with timer.stage("top_k", len(jobs)) as st:
+            jobs = ap.TopK(args.max, ap.rank_key).extend(jobs).items(); st["out"] = len(jobs)
+        with tempfile.TemporaryDirectory() as tmp, timer.stage("outputs", len(jobs)) as st:
+            ap.save_csv(jobs, str(Path(tmp) / "jobs.csv"))
+            ap.save_json(jobs, str(Path(tmp) / "jobs.json"))
+            st["out"] = len(jobs)
+    finally:
+        if args.memory:
+            tracemalloc.stop()
+    total = sum(r["seconds"] for r in timer.rows if not r.get("sub"))
+    timer.rows.append({"stage": "total", "in": n_raw, "out": len(jobs), "seconds": total,
+                       "jobs_per_s": n_raw / total if total else None})
+    if footprint:
+        timer.rows.append(footprint)
+    for r in timer.rows:
+        r["scale"] = n
+    return timer.rows
+
+def run_scale_stream(payloads: Dict[str, List[Dict[str, Any]]], n: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """--stream: the whole pipeline as one stage, fed lazily generated batches (as applypilot_ux.py --stream)."""
+    providers = {p.name: p for p in ap.PROVIDERS}
+    timer = StageTimer(args.memory)
+    include = [s.strip() for s in ap.DEFAULT_INCLUDE.split(",")]
+    ap.DESCRIPTIONS = ap.DescriptionStore()
+    ap.METRICS.reset()
+    raw = ((providers[name], rows) for name, rows in iter_scaled(payloads, n, ap.STREAM_BATCH) if name in providers)
+    if args.memory:
+        tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp, timer.stage("stream", n) as st:
+            with ap.JsonJobWriter(str(Path(tmp) / "jobs.jsonl")) as out:
+                jobs = ap.stream_pipeline(ap.iter_job_batches(raw, args.desc_max), include, [], args.days or None,
+                                          args.min_score, args.loose, args.strict, max_keep=args.max,
+                                          fuzzy=not args.no_fuzzy_dedupe, workers=args.workers, sink=out.write)
+            ap.save_csv(jobs, str(Path(tmp) / "jobs.csv"))
+            st["out"] = len(jobs)
+    finally:
+        if args.memory:
+            tracemalloc.stop()
+    for r in timer.rows:
+        r["scale"] = n
+    return timer.rows
+
+def run_score_parity(payloads: Dict[str, List[Dict[str, Any]]], n: int, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """compute_score vs score_batch over every normalized posting (no filters, so every term/penalty path is hit)."""
+    providers = {p.name: p for p in ap.PROVIDERS}
+    ap.DESCRIPTIONS = ap.DescriptionStore()
+    jobs = [j for name, rows in scale_payloads(payloads, n).items() if name in providers
+            for j in ap.normalize_jobs(providers[name].to_jobs(rows), args.desc_max)]
+    timer = StageTimer(False)
+    with timer.stage("compute_score", len(jobs)) as st:
+        scalar = [ap.compute_score(j) for j in jobs]; st["out"] = len(scalar)
+    ap.release_features(jobs)  # both backends start from cold feature caches
+    with timer.stage("score_batch", len(jobs)) as st:
+        batch = ap.score_batch(jobs).tolist(); st["out"] = len(batch)
+    bad = [(j.id, a, b) for j, a, b in zip(jobs, scalar, batch) if a != b]
+    for job_id, a, b in bad[:10]:
+        print(f"[MISMATCH] {job_id}: compute_score={a} score_batch={b}")
+    timer.rows.append({"stage": "mismatches", "in": len(jobs), "out": len(bad), "seconds": 0.0, "jobs_per_s": None})
+    for r in timer.rows:
+        r["scale"] = n
+    return timer.rows
+
+# ---- self-checks (--self-check): each returns None when it passes, else what went wrong ----
+def check_host_fairness() -> Optional[str]:
+    """A saturated host must not hold global slots: a request to another host still completes."""
+    import httpx
+    from ap_http import HttpSession
+    from ap_ratelimit import HostLimiter
+
+    async def run() -> Optional[str]:
+        release = asyncio.Event()
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.host == "busy.test":
+                await release.wait()
+            return httpx.Response(200, json={})
+        async with HttpSession("bench", 5, max_concurrency=4, per_host=2, transport=httpx.MockTransport(handler),
+                               limiter=HostLimiter(rate=1000, burst=1000)) as session:
+            busy = [asyncio.create_task(session.get(f"https://busy.test/{i}")) for i in range(12)]
+            await asyncio.sleep(0.05)
+            try:
+                await asyncio.wait_for(session.get("https://other.test/"), timeout=2)
+                error = None
+            except asyncio.TimeoutError:
+                error = "request to other.test waited behind the saturated busy.test"
+            release.set()
+            await asyncio.gather(*busy)
+            return error
+    return asyncio.run(run())
+
+GEO_PARITY_LOCATIONS = ("", "Remote", "Anywhere", "Worldwide", "Remote (US)", "Remote - Europe", "United States",
+                        "San Francisco, CA", "Berlin, Germany", "Sydney, Australia", "US or Remote", "Toronto / Remote",
+                        "EMEA", "Atlantis")
+
+def check_geo_exclude_remote() -> Optional[str]:
+    """--exclude Remote keeps the baseline meaning: drop only postings open to Anywhere."""
+    bad = []
+    for exclude in (["Remote"], ["Anywhere"]):
+        for loc in GEO_PARITY_LOCATIONS:
+            job = ap.Job(loc, "UX Designer", "Acme", loc, ap.GEO.countries(loc), False, "", "bench", None, "", [], None)
+            # Baseline: empty allowed set means Anywhere, and remote/anywhere both canonicalize to Anywhere
+            baseline = "Anywhere" not in (set(job.countries_allowed) or {"Anywhere"})
+            kept = bool(ap.filter_geography_and_recency([job], [], exclude, None))
+            if kept != baseline:
+                bad.append(f"{loc!r} {'kept' if kept else 'dropped'} by --exclude {exclude[0]}")
+    return "; ".join(bad) or None
+
+SELF_CHECKS = {
+    "http: per-host slots before global slots": check_host_fairness,
+    "geo: --exclude Remote matches the baseline": check_geo_exclude_remote,
+}
+
+def run_self_checks() -> int:
+    failed = 0
+    for name, check in SELF_CHECKS.items():
+        error = check()
+        print(f"[{'OK' if error is None else 'FAIL'}] {name}" + (f": {error}" if error else ""))
+        failed += error is not None
+    return 1 if failed else 0
+
+# Modules applypilot_ux only imports on the path that needs them; none may load for --help
+LAZY_MODULES = ("httpx", "rich", "numpy", "pandas", "pyarrow", "dateutil", "dotenv", "smtplib", "email.mime",
+                "concurrent.futures.process", "yaml")
+IMPORT_PROBES = {
+    "python (interpreter only)": ["-c", "pass"],
+    "import applypilot_ux": ["-c", "import applypilot_ux"],
+    "applypilot_ux.py --help": [str(Path(ap.__file__).with_name("applypilot_ux.py")), "--help"],
+}
+
+def _probe_env(scratch: str) -> Dict[str, str]:
+    """Probe environment: repo on the path, bytecode cached under `scratch`, no rule-spec cache writes."""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    repo = str(Path(ap.__file__).resolve().parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [repo, env.get("PYTHONPATH")]))
+    env["PYTHONPYCACHEPREFIX"] = os.path.join(scratch, "pycache")
+    env["AP_RULES_CACHE"] = ""
+    return env
+
+def _importtime(argv: List[str], cwd: str, env: Dict[str, str]) -> Tuple[float, List[Tuple[int, str, int]]]:
+    """(wall seconds, [(depth, module, cumulative µs)] in -X importtime order) for one fresh interpreter."""
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, "-X", "importtime", *argv], capture_output=True, text=True, cwd=cwd, env=env)
+    wall = time.perf_counter() - t0
+    entries = []
+    for line in p.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                entries.append(((len(name) - len(name.lstrip()) - 1) // 2, name.strip(), int(cumulative)))
+    return wall, entries
+
+def _top_level(entries: List[Tuple[int, str, int]], expand: str = "applypilot_ux") -> Dict[str, int]:
+    """Top-level imports (µs), with `expand` replaced by its direct imports (listed just before it)."""
+    top: Dict[str, int] = {}
+    children: Dict[str, int] = {}
+    for depth, name, us in entries:
+        if depth == 1:
+            children[name] = us
+        elif depth == 0:
+            if name == expand:
+                top.update(children)
+            else:
+                top[name] = us
+            children = {}
+    return top
+
+def run_import_time(runs: int) -> List[Dict[str, Any]]:
+    """Median startup per probe, run from a scratch cwd; an untimed first run per probe warms the
+    .pyc files under PYTHONPYCACHEPREFIX, so nothing is written into the repo."""
+    rows: List[Dict[str, Any]] = []
+    startup: set = set()  # modules the bare interpreter already imports (site, .pth hooks, encodings)
+    with tempfile.TemporaryDirectory(prefix="ap_importtime_") as scratch:
+        env = _probe_env(scratch)
+        samples_by_probe = {}
+        for probe, argv in IMPORT_PROBES.items():
+            _importtime(argv, scratch, env)
+            samples_by_probe[probe] = [_importtime(argv, scratch, env) for _ in range(runs)]
+    for probe, samples in samples_by_probe.items():
+        entries = samples[-1][1]
+        top = _top_level(entries)
+        if not rows:
+            startup = set(top)
+        rows.append({
+            "probe": probe, "runs": runs,
+            "wall_ms": statistics.median(w for w, _ in samples) * 1e3,
+            "import_ms": statistics.median(sum(us for d, _, us in e if d == 0) for _, e in samples) / 1e3,
+            "heaviest": sorted(((m, us) for m, us in top.items() if m not in startup), key=lambda kv: -kv[1])[:8],
+            "lazy_loaded": sorted({m for _, m, _ in entries} & set(LAZY_MODULES)),
+        })
+    return rows
+
+def print_import_rows(rows: List[Dict[str, Any]]) -> None:
+    head = f"{'probe':<26} {'wall ms':>9} {'import ms':>10}  heaviest imports (ms)"
+    print(head); print("-" * len(head))
+    for r in rows:
+        heavy = ", ".join(f"{m} {us / 1e3:.1f}" for m, us in r["heaviest"][:5])
+        print(f"{r['probe']:<26} {r['wall_ms']:>9.1f} {r['import_ms']:>10.1f}  {heavy}")
+        if r["lazy_loaded"]:
+            print(f"{'':<26} lazily loaded modules imported: {', '.join(r['lazy_loaded'])}")
+
+def print_rows(rows: List[Dict[str, Any]], memory: bool) -> None:
+    head = f"{'scale':>8} {'stage':<22} {'in':>8} {'out':>8} {'seconds':>9} {'jobs/s':>11}" + (f" {'peak MB':>9}" if memory else "")
+    print(head); print("-" * len(head))
+    for r in rows:
+        if r["stage"] == "bytes_per_job":
+            print(f"{r['scale']:>8} {'bytes/job':<22} {r['job']:>8.0f}  (dict-backed, non-interned: {r['legacy_job']:.0f})")
+            continue
+        line = f"{r['scale']:>8} {r['stage']:<22} {r['in']:>8} {r['out'] if r['out'] is not None else '':>8} " \
+               f"{r['seconds']:>9.3f} {r['jobs_per_s'] or 0:>11.0f}"
+        if memory and "peak_mb" in r:
+            line += f" {r['peak_mb']:>9.1f}"
+        print(line)
+
+def parse_args() -> argparse.Namespace:
+    bp = argparse.ArgumentParser(description="ApplyPilot offline pipeline benchmark")
+    bp.add_argument("--fixtures", default="", help="Directory written by applypilot_ux.py --record (default: synthetic payloads)")
+    bp.add_argument("--write-synthetic", default="", help="Write the synthetic payloads as fixtures to DIR and exit")
+    bp.add_argument("--scales", default="1000,10000,100000", help="Comma-separated posting counts")
+    bp.add_argument("--memory", action="store_true", help="Track per-stage peak memory with tracemalloc (slows timings)")
+    bp.add_argument("--json", default="", help="Write results as JSON to this path")
+    bp.add_argument("--days", type=int, default=0)
+    bp.add_argument("--min-score", type=int, default=50)
+    bp.add_argument("--max", type=int, default=4000)
+    bp.add_argument("--loose", action="store_true")
+    bp.add_argument("--strict", action="store_true")
+    bp.add_argument("--workers", type=int, default=1)
+    bp.add_argument("--desc-max", type=int, default=ap.DESC_MAX_CHARS)
+    bp.add_argument("--no-fuzzy-dedupe", action="store_true")
+    bp.add_argument("--stream", action="store_true", help="Benchmark the streaming pipeline (--stream) instead of the staged one")
+    bp.add_argument("--score-backend", choices=ap.SCORE_BACKENDS, default=ap.SCORE_BACKEND)
+    bp.add_argument("--rules", default=ap.RULES_PATH, help="Scoring rule file (as applypilot_ux.py --rules)")
+    bp.add_argument("--score-parity", action="store_true",
+                    help="Check the numpy score_batch against compute_score on every posting; exit 1 on any difference")
+    bp.add_argument("--self-check", action="store_true", help="Run the behaviour self-checks and exit (1 on any failure)")
+    bp.add_argument("--import-time", action="store_true",
+                    help="Measure CLI startup (python -X importtime) instead of the pipeline; exit 1 if --help loads a lazy module")
+    bp.add_argument("--import-runs", type=int, default=5, help="Fresh interpreters per --import-time probe (median reported)")
+    return bp.parse_args()
+
+def main() -> int:
+    args = parse_args()
+    if args.self_check:
+        return run_self_checks()
+    if args.import_time:
+        rows = run_import_time(args.import_runs)
+        print_import_rows(rows)
+        if args.json:
+            Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+            print(f"[OK] Results written to {args.json}")
+        if any(r["lazy_loaded"] for r in rows if r["probe"].endswith("--help")):
+            print("[FAIL] --help imports modules that should load lazily")
+            return 1
+        return 0
+    ap.setup_logging()
+    if args.write_synthetic:
+        for name, rows in synthetic_payloads().items():
+            ap.save_fixture(args.write_synthetic, name, rows, ["synthetic"])
+        print(f"[OK] Synthetic fixtures written to {args.write_synthetic}")
+        return 0
+    ap.SCORE_BACKEND = args.score_backend
+    ap.use_rules(args.rules)
+    payloads = load_payloads(args.fixtures or None)
+    runner = run_score_parity if args.score_parity else run_scale_stream if args.stream else run_scale
+    rows: List[Dict[str, Any]] = []
+    for n in [int(s) for s in args.scales.split(",") if s.strip()]:
+        scale_rows = runner(payloads, n, args)
+        print_rows(scale_rows, args.memory); print()
+        rows.extend(scale_rows)
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        print(f"[OK] Results written to {args.json}")
+    if args.score_parity and any(r["stage"] == "mismatches" and r["out"] for r in rows):
+        print("[FAIL] score_batch differs from compute_score")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# Posting-date handling for ApplyPilot
+# - posted_at is parsed once at normalization into UTC epoch seconds (int)
+# - Fast path: datetime.fromisoformat for ISO-8601 (what Remotive/RemoteOK/Greenhouse/SmartRecruiters send),
+#   epoch seconds/millis for numbers (Lever); dateutil only for odd formats, behind an LRU
+# - Recency filtering compares against one precomputed cutoff instead of datetime.now() per job
+from __future__ import annotations
+
+import os, time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional
+
+ODD_DATE_CACHE = int(os.getenv("AP_ODD_DATE_CACHE", "4096"))
+_DAY_S = 86400
+_MILLIS_ABOVE = 100_000_000_000  # larger epoch values are milliseconds (1e11 s is year 5138)
+
+def _epoch(dt: datetime) -> int:
+    # Naive timestamps are taken as UTC: board APIs publish UTC, and the host timezone must not shift them
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+@lru_cache(maxsize=ODD_DATE_CACHE)
+def _parse_odd(s: str) -> Optional[int]:
+    from dateutil import parser as dtparse  # only paid for when a provider sends a non-ISO date
+    try:
+        return _epoch(dtparse.parse(s))
+    except (ValueError, OverflowError):
+        return None
+
+def parse_ts(v: Any) -> Optional[int]:
+    """UTC epoch seconds from an ISO-8601 string, epoch seconds/millis, or anything dateutil reads."""
+    if v is None or v == "" or isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        return int(v / 1000 if abs(v) >= _MILLIS_ABOVE else v)
+    if isinstance(v, datetime):
+        return _epoch(v)
+    s = str(v).strip()
+    if not s:
+        return None
+    try:
+        return _epoch(datetime.fromisoformat(s[:-1] + "+00:00" if s[-1] in "Zz" else s))
+    except ValueError:
+        pass
+    if s.isdigit():
+        return parse_ts(int(s))
+    return _parse_odd(s)
+
+def to_iso(ts: Optional[int]) -> Optional[str]:
+    """ISO-8601 UTC rendering for outputs (same shape the pipeline used to store)."""
+    return None if ts is None else datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+def to_day(ts: Optional[int]) -> str:
+    return "—" if ts is None else datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+def recency_cutoff(days: int, now: Optional[float] = None) -> int:
+    """Postings at or before this epoch are more than `days` whole days old."""
+    return int(time.time() if now is None else now) - (days + 1) * _DAY_S
@@ -0,0 +1,132 @@
+# Near-duplicate detection for ApplyPilot postings
+# - Company canonicalization ("GitLab Inc." -> "gitlab")
+# - MinHash signatures over word 3-shingles of title + description
+# - Incremental LSH index bucketed per canonical company: roughly linear time, and usable
+#   both for batch dedupe and for a streaming pipeline (first-come representative wins)
+# - numpy loads with the first MinHasher (canonical_company and --no-fuzzy-dedupe runs never need it)
+from __future__ import annotations
+
+import hashlib, os, re, unicodedata, zlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+NEAR_DUP_THRESHOLD = float(os.getenv("AP_NEAR_DUP_THRESHOLD", "0.7"))    # est. Jaccard of title+description shingles
+TITLE_SIM_THRESHOLD = float(os.getenv("AP_TITLE_SIM_THRESHOLD", "0.6"))  # Jaccard of title word sets
+LSH_BANDS, LSH_ROWS = 16, 4
+MAX_SHINGLE_TOKENS = 400
+MAX_PROBE = 8  # representatives compared per LSH bucket; keeps boilerplate-heavy buckets linear
+SIG_CACHE_MAX = int(os.getenv("AP_SIG_CACHE_MAX", "50000"))
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "gmbh", "ag", "sa", "sas", "plc", "pty", "bv", "nv", "oy", "ab", "as", "srl", "kk",
+}
+
+def _tokens(s: str) -> List[str]:
+    s = unicodedata.normalize("NFKD", s or "").encode("ascii", "ignore").decode("ascii")
+    return _TOKEN_RE.findall(s.lower())
+
+def canonical_company(name: str) -> str:
+    toks = _tokens(name)
+    while len(toks) > 1 and toks[-1] in _LEGAL_SUFFIXES:
+        toks.pop()
+    if len(toks) > 1 and toks[0] == "the":
+        toks = toks[1:]
+    return "".join(toks)
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    return frozenset(_tokens(title))
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    """MinHash via multiply-shift hashing of CRC32 shingle ids (uint64 arithmetic wraps by design)."""
+    def __init__(self, num_perm: int = LSH_BANDS * LSH_ROWS, seed: int = 1):
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        import numpy as np
+        toks = _tokens(text)[:MAX_SHINGLE_TOKENS]
+        if len(toks) >= 3:
+            shingles = {" ".join(toks[i:i + 3]) for i in range(len(toks) - 2)}
+        else:
+            shingles = {" ".join(toks)}
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        h = (np.multiply.outer(self.a, x) + self.b[:, None]) >> np.uint64(32)
+        return h.min(axis=1).astype(np.uint32)
+
+class SignatureCache:
+    """Bounded LRU of text digest -> MinHash signature, kept across runs by --serve.
+
+    Shingling and hashing dominate dedupe; postings that did not change between runs reuse
+    their signature. Valid for any index built with the same (seeded) MinHasher parameters.
+    """
+    def __init__(self, max_items: int = SIG_CACHE_MAX):
+        self.max_items = max_items
+        self._sigs: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+
+    def signature(self, hasher: MinHasher, text: str) -> np.ndarray:
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        sig = self._sigs.get(key)
+        if sig is not None:
+            self._sigs.move_to_end(key)
+            return sig
+        sig = self._sigs[key] = hasher.signature(text)
+        if len(self._sigs) > self.max_items:
+            self._sigs.popitem(last=False)
+        return sig
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+class NearDupIndex:
+    """Incremental LSH index of cluster representatives.
+
+    `match_or_add` returns (cluster_id, is_new): either the id of an existing cluster
+    whose representative has a similar title and near-identical title+description
+    shingles at the same canonical company, or a fresh id. Only signatures and title
+    token sets are kept, never the postings themselves.
+    """
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, title_threshold: float = TITLE_SIM_THRESHOLD,
+                 sig_cache: Optional[SignatureCache] = None):
+        self.threshold = threshold
+        self.sig_cache = sig_cache
+        self.title_threshold = title_threshold
+        self.hasher = MinHasher(LSH_BANDS * LSH_ROWS)
+        self._buckets: Dict[Tuple[str, int, bytes], List[int]] = {}
+        self._sigs: List[np.ndarray] = []
+        self._titles: List[FrozenSet[str]] = []
+
+    def __len__(self) -> int:
+        return len(self._sigs)
+
+    def match_or_add(self, company_key: str, title: str, text: str) -> Tuple[int, bool]:
+        doc = f"{title} {text}"
+        sig = self.sig_cache.signature(self.hasher, doc) if self.sig_cache is not None else self.hasher.signature(doc)
+        tt = title_tokens(title)
+        keys = [(company_key, b, sig[b * LSH_ROWS:(b + 1) * LSH_ROWS].tobytes()) for b in range(LSH_BANDS)]
+        tried = set()
+        for key in keys:
+            for cid in self._buckets.get(key, ())[:MAX_PROBE]:
+                if cid in tried:
+                    continue
+                tried.add(cid)
+                if _jaccard(tt, self._titles[cid]) >= self.title_threshold and \
+                        float((sig == self._sigs[cid]).mean()) >= self.threshold:
+                    return cid, False
+        cid = len(self._sigs)
+        self._sigs.append(sig)
+        self._titles.append(tt)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(cid)
+        return cid, True
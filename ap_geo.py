@@ -0,0 +1,268 @@
+# Geography index for ApplyPilot
+# - Region table with aliases and a hierarchy (Anywhere ⊃ EMEA ⊃ Europe ⊃ EU ⊃ Germany, ...)
+# - Location strings ("San Francisco, CA", "Remote (Europe)") resolve once, behind an LRU, to interned region names
+# - Each region is a bit; include/exclude lists compile to masks so the per-job check is two int ANDs
+from __future__ import annotations
+
+import os, re, sys, unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GEO_CACHE = int(os.getenv("AP_GEO_CACHE", "16384"))
+
+WORLD = "Anywhere"
+
+# name: (parents, aliases). Names double as aliases; lookups are on ascii-folded, dot-free, lowercased words.
+REGIONS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    WORLD: ((), ("remote", "worldwide", "global", "work from anywhere", "fully remote", "distributed", "international")),
+    "EMEA": ((WORLD,), ()),
+    "APAC": ((WORLD,), ("asia pacific",)),
+    "Americas": ((WORLD,), ("amer",)),
+    "North America": (("Americas",), ()),
+    "LATAM": (("Americas",), ("latin america",)),
+    "South America": (("LATAM",), ()),
+    "Central America": (("LATAM",), ()),
+    "Europe": (("EMEA",), ()),
+    "EU": (("Europe",), ("european union",)),
+    "Middle East": (("EMEA",), ("mena",)),
+    "Africa": (("EMEA",), ()),
+    "Asia": (("APAC",), ()),
+    "Oceania": (("APAC",), ("anz",)),
+    # North America
+    "United States": (("North America",), (
+        "us", "usa", "united states of america", "san francisco", "bay area", "sf bay area", "new york", "nyc",
+        "seattle", "austin", "boston", "chicago", "los angeles", "denver", "atlanta", "miami", "dallas", "houston",
+        "portland", "san diego", "san jose", "salt lake city", "phoenix", "raleigh", "pittsburgh", "philadelphia",
+        "minneapolis", "detroit", "nashville", "california", "texas", "washington", "massachusetts", "colorado",
+        "illinois", "florida", "virginia", "north carolina", "oregon", "utah", "arizona", "pennsylvania", "ohio",
+        "michigan", "minnesota", "new jersey", "tennessee", "maryland")),
+    "Canada": (("North America",), ("toronto", "vancouver", "montreal", "ottawa", "calgary", "ontario", "british columbia", "quebec")),
+    "Mexico": (("North America", "LATAM"), ("mexico city", "guadalajara")),
+    # LATAM
+    "Brazil": (("South America",), ("sao paulo", "rio de janeiro")),
+    "Argentina": (("South America",), ("buenos aires",)),
+    "Chile": (("South America",), ("santiago",)),
+    "Colombia": (("South America",), ("bogota", "medellin")),
+    "Peru": (("South America",), ("lima",)),
+    "Uruguay": (("South America",), ("montevideo",)),
+    "Costa Rica": (("Central America",), ()),
+    # Europe
+    "United Kingdom": (("Europe",), ("uk", "great britain", "britain", "england", "scotland", "wales", "northern ireland",
+                                     "london", "manchester", "edinburgh", "bristol", "glasgow", "belfast")),
+    "Ireland": (("EU",), ("dublin", "cork")),
+    "Germany": (("EU",), ("berlin", "munich", "hamburg", "frankfurt", "cologne")),
+    "France": (("EU",), ("paris", "lyon")),
+    "Netherlands": (("EU",), ("amsterdam", "rotterdam", "the netherlands")),
+    "Spain": (("EU",), ("madrid", "barcelona")),
+    "Portugal": (("EU",), ("lisbon", "porto")),
+    "Italy": (("EU",), ("milan", "rome")),
+    "Belgium": (("EU",), ("brussels",)),
+    "Austria": (("EU",), ("vienna",)),
+    "Sweden": (("EU",), ("stockholm",)),
+    "Denmark": (("EU",), ("copenhagen",)),
+    "Finland": (("EU",), ("helsinki",)),
+    "Poland": (("EU",), ("warsaw", "krakow")),
+    "Czechia": (("EU",), ("czech republic", "prague")),
+    "Romania": (("EU",), ("bucharest",)),
+    "Greece": (("EU",), ("athens",)),
+    "Estonia": (("EU",), ("tallinn",)),
+    "Lithuania": (("EU",), ("vilnius",)),
+    "Latvia": (("EU",), ("riga",)),
+    "Luxembourg": (("EU",), ()),
+    "Hungary": (("EU",), ("budapest",)),
+    "Croatia": (("EU",), ("zagreb",)),
+    "Bulgaria": (("EU",), ("sofia",)),
+    "Switzerland": (("Europe",), ("zurich", "geneva")),
+    "Norway": (("Europe",), ("oslo",)),
+    "Serbia": (("Europe",), ("belgrade",)),
+    "Ukraine": (("Europe",), ("kyiv", "kiev")),
+    "Turkey": (("Europe", "Middle East"), ("turkiye", "istanbul")),
+    # Middle East / Africa
+    "Israel": (("Middle East",), ("tel aviv",)),
+    "United Arab Emirates": (("Middle East",), ("uae", "dubai", "abu dhabi")),
+    "Saudi Arabia": (("Middle East",), ("riyadh",)),
+    "Egypt": (("Africa", "Middle East"), ("cairo",)),
+    "South Africa": (("Africa",), ("cape town", "johannesburg")),
+    "Nigeria": (("Africa",), ("lagos",)),
+    "Kenya": (("Africa",), ("nairobi",)),
+    # APAC
+    "India": (("Asia",), ("bangalore", "bengaluru", "hyderabad", "pune", "mumbai", "delhi", "chennai", "gurgaon", "noida")),
+    "Singapore": (("Asia",), ()),
+    "Japan": (("Asia",), ("tokyo", "osaka")),
+    "China": (("Asia",), ("shanghai", "beijing", "shenzhen")),
+    "Hong Kong": (("Asia",), ()),
+    "South Korea": (("Asia",), ("korea", "seoul")),
+    "Taiwan": (("Asia",), ("taipei",)),
+    "Philippines": (("Asia",), ("manila",)),
+    "Indonesia": (("Asia",), ("jakarta",)),
+    "Malaysia": (("Asia",), ("kuala lumpur",)),
+    "Vietnam": (("Asia",), ("ho chi minh city", "hanoi")),
+    "Thailand": (("Asia",), ("bangkok",)),
+    "Pakistan": (("Asia",), ("karachi", "lahore")),
+    "Australia": (("Oceania",), ("au", "sydney", "melbourne", "brisbane", "perth", "adelaide", "canberra", "nsw", "qld")),
+    "New Zealand": (("Oceania",), ("nz", "auckland", "wellington", "christchurch")),
+}
+
+# Upper-case two-letter parts ("Berlin, DE"): ISO country codes, plus US state / Canadian province codes
+ISO_CODES = {
+    "US": "United States", "GB": "United Kingdom", "UK": "United Kingdom", "AU": "Australia", "NZ": "New Zealand",
+    "CA": "Canada", "MX": "Mexico", "BR": "Brazil", "AR": "Argentina", "CL": "Chile", "CO": "Colombia",
+    "DE": "Germany", "FR": "France", "IE": "Ireland", "NL": "Netherlands", "ES": "Spain", "PT": "Portugal",
+    "IT": "Italy", "BE": "Belgium", "AT": "Austria", "SE": "Sweden", "DK": "Denmark", "FI": "Finland",
+    "PL": "Poland", "CZ": "Czechia", "CH": "Switzerland", "NO": "Norway", "IL": "Israel", "AE": "United Arab Emirates",
+    "IN": "India", "SG": "Singapore", "JP": "Japan", "CN": "China", "HK": "Hong Kong", "KR": "South Korea",
+    "TW": "Taiwan", "PH": "Philippines", "ID": "Indonesia", "MY": "Malaysia", "VN": "Vietnam", "ZA": "South Africa",
+    "EU": "EU",
+}
+US_STATES = frozenset(
+    "AL AK AZ AR CA CO CT DE FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ NM NY NC "
+    "ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY DC".split()
+)
+CA_PROVINCES = frozenset("ON BC QC AB MB NS NB NL PE SK".split())
+
+_PART_SPLIT_RE = re.compile(r"[,/;|()\[\]&]|\s[-–—]\s|\bor\b|\band\b", re.I)
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MAX_ALIAS_WORDS = 4
+
+def _words(s: str) -> List[str]:
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return _WORD_RE.findall(s.lower().replace(".", ""))
+
+class RegionFilter:
+    """Compiled include/exclude lists; `allows(mask)` is the per-job check."""
+    __slots__ = ("include", "exclude", "unknown_ok", "known")
+    def __init__(self, include: Optional[int], exclude: int, unknown_ok: bool, known: int):
+        self.include, self.exclude, self.unknown_ok, self.known = include, exclude, unknown_ok, known
+
+    def allows(self, mask: int) -> bool:
+        if mask & self.exclude:
+            return False
+        if self.include is None:
+            return True
+        # Locations we cannot place only pass when the include list accepts jobs from anywhere
+        return bool(mask & self.include) or (self.unknown_ok and bool(mask & ~self.known))
+
+class GeoIndex:
+    """Interned region IDs (one bit each) with hierarchy closures and cached location resolution.
+
+    Include matches a job when any of its regions is an included region, inside one, or
+    contains one (a "Europe" job is open to a UK candidate; a UK job is in Europe).
+    Exclude only drops a job whose regions are an excluded region or inside one; the world
+    region (Anywhere/Remote) is the exception and excludes only itself.
+    Unknown location parts are interned as their own leaf bits, so they still match exactly.
+    """
+    def __init__(self, regions: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = REGIONS):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._aliases: Dict[str, int] = {}
+        for name in regions:
+            self._intern(name)
+        for name, (_, aliases) in regions.items():
+            rid = self._ids[name.lower()]
+            for a in (name, *aliases):
+                self._aliases[" ".join(_words(a))] = rid
+        self.world = self._ids[WORLD.lower()]
+        self.known = (1 << len(self.names)) - 1
+        parents = {self._ids[n.lower()]: [self._ids[p.lower()] for p in ps] for n, (ps, _) in regions.items()}
+        self.ancestors: Dict[int, int] = {}
+        for rid in parents:
+            bits, stack = 0, list(parents[rid])
+            while stack:
+                p = stack.pop()
+                if not bits >> p & 1:
+                    bits |= 1 << p
+                    stack.extend(parents[p])
+            self.ancestors[rid] = bits
+        self.descendants: Dict[int, int] = {rid: 0 for rid in parents}
+        for rid, anc in self.ancestors.items():
+            for p in parents:
+                if anc >> p & 1:
+                    self.descendants[p] |= 1 << rid
+        self.split = lru_cache(maxsize=GEO_CACHE)(self._split)
+        self.mask = lru_cache(maxsize=GEO_CACHE)(self._mask)
+
+    def _intern(self, name: str) -> int:
+        key = name.lower()
+        rid = self._ids.get(key)
+        if rid is None:
+            rid = self._ids[key] = len(self.names)
+            self.names.append(sys.intern(name))
+        return rid
+
+    def _part_ids(self, part: str, prev: Tuple[int, ...], first: bool) -> List[int]:
+        code = part.strip()
+        if len(code) == 2 and code.isalpha() and code.isupper():
+            us = self._ids["united states"]
+            if code in CA_PROVINCES and not first:
+                return [self._ids["canada"]]
+            # "City, ST" is the usual US shape; read as a country code after a placed non-US part ("Berlin, DE")
+            if code in US_STATES and not first and (code not in ISO_CODES or not prev or prev == (us,)):
+                return [us]
+            if code in ISO_CODES:
+                return [self._ids[ISO_CODES[code].lower()]]
+        words, out, i = _words(part), [], 0
+        while i < len(words):
+            for n in range(min(_MAX_ALIAS_WORDS, len(words) - i), 0, -1):
+                rid = self._aliases.get(" ".join(words[i:i + n]))
+                if rid is not None:
+                    out.append(rid); i += n
+                    break
+            else:
+                i += 1
+        return out
+
+    def _split(self, location: str) -> Tuple[str, ...]:
+        """Region names for a location string: placed regions, else the raw parts, else ()."""
+        parts = [p.strip() for p in _PART_SPLIT_RE.split(location or "") if p and p.strip()]
+        ids: List[int] = []
+        prev: Tuple[int, ...] = ()
+        for k, part in enumerate(parts):
+            found = tuple(self._part_ids(part, prev, first=(k == 0)))
+            ids.extend(found)
+            prev = found
+        ids = list(dict.fromkeys(ids))
+        if any(r != self.world for r in ids):
+            ids = [r for r in ids if r != self.world]  # "Remote (US)" is US-only
+        if ids:
+            return tuple(self.names[r] for r in ids)
+        return tuple(dict.fromkeys(sys.intern(p) for p in parts))
+
+    def countries(self, location: Optional[str]) -> Tuple[str, ...]:
+        """countries_allowed for a posting's location string (shared tuple; Anywhere when empty)."""
+        return self.split(location or "") or (WORLD,)
+
+    def _mask(self, names: Tuple[str, ...]) -> int:
+        bits = 0
+        for n in names:
+            rid = self._ids.get(n.lower())
+            if rid is None:
+                placed = self.split(n)
+                if placed and placed != (n,):
+                    bits |= self._mask(placed)
+                    continue
+                rid = self._intern(n)
+            bits |= 1 << rid
+        return bits
+
+    def compile(self, include: Iterable[str], exclude: Iterable[str]) -> RegionFilter:
+        inc_bits = self.mask(tuple(c for c in include if c))
+        exc_bits = self.mask(tuple(c for c in exclude if c))
+        inc: Optional[int] = None
+        if inc_bits:
+            inc = inc_bits
+            for rid in self._iter_bits(inc_bits & self.known):
+                inc |= self.ancestors[rid] | self.descendants[rid]
+        exc = exc_bits
+        for rid in self._iter_bits(exc_bits & self.known):
+            if rid != self.world:  # excluding Remote/Anywhere drops "open to anywhere" postings, not every region
+                exc |= self.descendants[rid]
+        return RegionFilter(inc, exc, unknown_ok=bool(inc_bits >> self.world & 1), known=self.known)
+
+    @staticmethod
+    def _iter_bits(bits: int) -> Iterable[int]:
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+GEO = GeoIndex()
@@ -0,0 +1,162 @@
+# Shared HTTP session layer for ApplyPilot providers
+# - One pooled httpx.AsyncClient per pipeline run (keep-alive, HTTP/2 when h2 is installed)
+# - Global + per-host concurrency bounds for the async fetch engine
+# - Per-host token buckets and retry/backoff (ap_ratelimit) under every request
+# - httpx is imported when a session opens, so --help / --from-snapshot runs never load it
+from __future__ import annotations
+
+import asyncio, json, os
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+from ap_httpcache import HttpCache
+from ap_ratelimit import HostLimiter, RetryPolicy, RETRY_STATUSES, THROTTLE_STATUSES, parse_retry_after
+from ap_metrics import RunMetrics
+
+MAX_CONCURRENCY = int(os.getenv("AP_MAX_CONCURRENCY", "16"))
+PER_HOST_CONCURRENCY = int(os.getenv("AP_PER_HOST_CONCURRENCY", "4"))
+MAX_KEEPALIVE = int(os.getenv("AP_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("AP_KEEPALIVE_EXPIRY", "30"))
+
+def http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class HttpSession:
+    """Pipeline-scoped HTTP session shared by every provider.
+
+    Owns a single pooled AsyncClient, so TLS handshakes and connections are reused
+    across providers and company boards, and bounds in-flight requests globally and
+    per host. Use as `async with HttpSession(...) as session:`; the client is closed
+    on exit. With a `cache`, `get_json` goes through conditional GETs; with `metrics`,
+    requests and bytes are charged to the provider/board in scope. Every request first
+    takes a token from its host's bucket; transport errors and 429/5xx responses are
+    retried under `retry` (one policy, and so one time budget, per session).
+    """
+    def __init__(self, user_agent: str, timeout: float, max_concurrency: int = MAX_CONCURRENCY,
+                 per_host: int = PER_HOST_CONCURRENCY, http2: Optional[bool] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None, cache: Optional[HttpCache] = None,
+                 metrics: Optional[RunMetrics] = None, limiter: Optional[HostLimiter] = None,
+                 retry: Optional[RetryPolicy] = None):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_host = max(1, per_host)
+        self.http2 = http2_available() if http2 is None else http2
+        self._transport = transport
+        self.cache = cache
+        self.metrics = metrics
+        self.limiter = limiter or HostLimiter()
+        self.retry = retry or RetryPolicy()
+        self.client: Optional[httpx.AsyncClient] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self) -> "HttpSession":
+        self.open()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    def open(self) -> None:
+        if self.client is not None:
+            return
+        import httpx
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=min(MAX_KEEPALIVE, self.max_concurrency),
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout, headers={"User-Agent": self.user_agent},
+            limits=limits, http2=self.http2, transport=self._transport,
+        )
+        self._global = asyncio.Semaphore(self.max_concurrency)
+        self._hosts = {}
+
+    async def aclose(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        self.client = None
+
+    def _host_sem(self, host: str) -> asyncio.Semaphore:
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        if self.client is None:
+            raise RuntimeError("HttpSession is not open")
+        import httpx
+        host = httpx.URL(url).host
+        bucket = self.limiter.bucket(host)
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            try:
+                # Host slot first: tasks queued on a busy host must not sit on global slots other hosts could use
+                async with self._host_sem(host):
+                    async with self._global:
+                        r = await self.client.get(url, **kwargs)
+            except httpx.TransportError:
+                delay = self.retry.backoff(attempt)
+                if not self.retry.allow(attempt, delay):
+                    raise
+                throttled = False
+            else:
+                if r.status_code not in RETRY_STATUSES:
+                    bucket.succeeded()
+                    return r
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                throttled = r.status_code in THROTTLE_STATUSES
+                if throttled:
+                    bucket.throttled(retry_after)
+                delay = self.retry.backoff(attempt, retry_after)
+                if not self.retry.allow(attempt, delay):
+                    return r  # out of attempts/budget: the caller's raise_for_status reports it
+            if self.metrics is not None:
+                self.metrics.add_retry(throttled)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
+        if self.cache is None:
+            r = await self.get(url, params=params, **kwargs)
+            self._count(r)
+            r.raise_for_status()
+            return r.json()
+        import httpx
+        full_url = str(httpx.URL(url, params=params))
+        meta = self.cache.lookup(full_url)
+        if meta and self.cache.is_fresh(meta):
+            body = self.cache.read_body(full_url)
+            if body is not None:
+                if self.metrics is not None:
+                    self.metrics.add_fetch(0, cache_hit=True)
+                return json.loads(body)
+        headers = {**kwargs.pop("headers", {}), **self.cache.conditional_headers(meta)}
+        r = await self.get(full_url, headers=headers, **kwargs)
+        self._count(r)
+        if r.status_code == 304 and meta:
+            body = self.cache.read_body(full_url)
+            if body is not None:
+                self.cache.revalidated(full_url, meta)
+                return json.loads(body)
+            # Body went missing underneath us: refetch unconditionally
+            self.cache.drop(full_url)
+            r = await self.get(full_url, **kwargs)
+            self._count(r)
+        r.raise_for_status()
+        self.cache.store(full_url, r.headers, r.content)
+        return r.json()
+
+    def _count(self, r: httpx.Response) -> None:
+        if self.metrics is not None:
+            self.metrics.add_fetch(len(r.content), not_modified=r.status_code == 304)
@@ -0,0 +1,118 @@
+# On-disk conditional-GET cache for ApplyPilot board endpoints
+# - Keyed by full URL (incl. query); stores ETag / Last-Modified + gzipped body
+# - Fresh entries (younger than TTL) are served without a request; stale ones are
+#   revalidated with If-None-Match / If-Modified-Since and 304s are served from disk
+# - Size-capped: least recently used entries are evicted once max_bytes is exceeded
+from __future__ import annotations
+
+import gzip, hashlib, json, os, time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+HTTP_CACHE_DIR = os.getenv("AP_HTTP_CACHE_DIR", "./data/http_cache")
+HTTP_CACHE_TTL = int(os.getenv("AP_HTTP_CACHE_TTL", "0"))
+HTTP_CACHE_MAX_MB = int(os.getenv("AP_HTTP_CACHE_MAX_MB", "200"))
+
+class HttpCache:
+    """URL-keyed response cache: `<key>.json` holds validators, `<key>.gz` the body."""
+    def __init__(self, root: str | Path = HTTP_CACHE_DIR, ttl: int = HTTP_CACHE_TTL,
+                 max_bytes: int = HTTP_CACHE_MAX_MB * 1024 * 1024):
+        self.root = Path(root)
+        self.ttl = max(0, ttl)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._size = sum(e.stat().st_size for e in os.scandir(self.root) if e.is_file())
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        k = self.key(url)
+        return self.root / f"{k}.json", self.root / f"{k}.gz"
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        meta_p, _ = self._paths(url)
+        try:
+            meta = json.loads(meta_p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def is_fresh(self, meta: Dict[str, Any]) -> bool:
+        return bool(self.ttl) and (time.time() - meta.get("stored_at", 0)) < self.ttl
+
+    def conditional_headers(self, meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        meta_p, body_p = self._paths(url)
+        try:
+            body = gzip.decompress(body_p.read_bytes())
+        except (OSError, EOFError, gzip.BadGzipFile):
+            return None
+        now = time.time()
+        os.utime(meta_p, (now, now))  # mark as recently used for eviction
+        return body
+
+    def revalidated(self, url: str, meta: Dict[str, Any]) -> None:
+        """Record a 304: the cached body is current again."""
+        meta["stored_at"] = time.time()
+        self._write(self._paths(url)[0], json.dumps(meta).encode("utf-8"))
+
+    def store(self, url: str, headers: Any, body: bytes) -> None:
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        if not (etag or last_modified or self.ttl):
+            self.drop(url)  # nothing to revalidate with and no TTL: caching buys us nothing
+            return
+        meta_p, body_p = self._paths(url)
+        self._write(body_p, gzip.compress(body, compresslevel=1))
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "stored_at": time.time()}
+        self._write(meta_p, json.dumps(meta).encode("utf-8"))
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def drop(self, url: str) -> None:
+        for path in self._paths(url):
+            try:
+                size = path.stat().st_size
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    def _write(self, path: Path, data: bytes) -> None:
+        try:
+            old = path.stat().st_size
+        except OSError:
+            old = 0
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        self._size += len(data) - old
+
+    def evict(self) -> None:
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        entries = []
+        for e in os.scandir(self.root):
+            if e.name.endswith(".json"):
+                st = e.stat()
+                body = self.root / (e.name[:-5] + ".gz")
+                size = st.st_size + (body.stat().st_size if body.exists() else 0)
+                entries.append((st.st_mtime, e.path, str(body), size))
+        entries.sort()
+        target = int(self.max_bytes * 0.9)
+        for _, meta_path, body_path, size in entries:
+            if self._size <= target:
+                break
+            for path in (meta_path, body_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size -= size
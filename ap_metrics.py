@@ -0,0 +1,169 @@
+# Run instrumentation for ApplyPilot
+# - Wall/CPU time and in/out counts per pipeline stage, provider and company board
+# - Bytes/requests fetched, attributed to the provider/board in scope (contextvars, so async-safe)
+# - JSON run report and an optional Prometheus text-format file (node_exporter textfile collector)
+from __future__ import annotations
+
+import json, os, time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RUN_REPORT_PATH = os.getenv("AP_RUN_REPORT", "./data/run_report.json")
+PROM_FILE_PATH = os.getenv("AP_PROM_FILE", "")
+
+# (provider, board) that HTTP traffic is currently attributed to
+_SCOPE: ContextVar[Tuple[str, str]] = ContextVar("ap_metrics_scope", default=("", ""))
+
+def _counters() -> Dict[str, float]:
+    return {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "in": 0, "out": 0,
+            "requests": 0, "bytes": 0, "cache_hits": 0, "not_modified": 0, "retries": 0, "throttled": 0, "errors": 0}
+
+class Sample:
+    """Handle yielded by the timing context managers; set `out` (and optionally `n_in`) before exit."""
+    __slots__ = ("n_in", "out")
+    def __init__(self, n_in: Optional[int]):
+        self.n_in = n_in
+        self.out: Optional[int] = None
+
+class RunMetrics:
+    """Accumulates timings and counters for one pipeline run.
+
+    Stages are keyed by name and accumulate across calls (e.g. per-batch email sends).
+    CPU time is process CPU, so it is only meaningful for synchronous sections; for
+    concurrent provider/board fetches only wall time, counts and bytes are recorded.
+    """
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at = datetime.now(timezone.utc)
+        self._t0 = time.perf_counter()
+        self._c0 = time.process_time()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.providers: Dict[str, Dict[str, float]] = {}
+        self.boards: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self.meta: Dict[str, Any] = {}
+
+    @contextmanager
+    def _timed(self, row: Dict[str, float], n_in: Optional[int], cpu: bool = True) -> Iterator[Sample]:
+        s = Sample(n_in)
+        t0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield s
+        except BaseException:
+            row["errors"] += 1
+            raise
+        finally:
+            row["calls"] += 1
+            row["wall_s"] += time.perf_counter() - t0
+            if cpu:
+                row["cpu_s"] += time.process_time() - c0
+            row["in"] += s.n_in or 0
+            row["out"] += s.out or 0
+
+    def stage(self, name: str, n_in: Optional[int] = None) -> Iterator[Sample]:
+        """`with METRICS.stage("dedupe", len(jobs)) as s: ...; s.out = len(result)`"""
+        return self._timed(self.stages.setdefault(name, _counters()), n_in)
+
+    @contextmanager
+    def provider(self, name: str) -> Iterator[Sample]:
+        """Scope a provider's fetch: wall time, raw rows out, and all HTTP traffic inside it."""
+        token = _SCOPE.set((name, ""))
+        try:
+            with self._timed(self.providers.setdefault(name, _counters()), None, cpu=False) as s:
+                yield s
+        finally:
+            _SCOPE.reset(token)
+
+    @contextmanager
+    def board(self, provider: str, board: str) -> Iterator[Sample]:
+        """Scope one company board inside a provider fan-out."""
+        token = _SCOPE.set((provider, board))
+        try:
+            with self._timed(self.boards.setdefault((provider, board), _counters()), None, cpu=False) as s:
+                yield s
+        finally:
+            _SCOPE.reset(token)
+
+    def _scoped_rows(self) -> List[Dict[str, float]]:
+        provider, board = _SCOPE.get()
+        rows = [self.providers.setdefault(provider or "-", _counters())]
+        if board:
+            rows.append(self.boards.setdefault((provider, board), _counters()))
+        return rows
+
+    def add_fetch(self, nbytes: int, cache_hit: bool = False, not_modified: bool = False) -> None:
+        """Called by HttpSession per request; charged to the provider/board in scope."""
+        for row in self._scoped_rows():
+            row["requests"] += 0 if cache_hit else 1
+            row["bytes"] += nbytes
+            row["cache_hits"] += cache_hit
+            row["not_modified"] += not_modified
+
+    def add_retry(self, throttled: bool = False) -> None:
+        """Called by HttpSession before each retry; `throttled` for 429/503 responses."""
+        for row in self._scoped_rows():
+            row["retries"] += 1
+            row["throttled"] += throttled
+
+    def report(self) -> Dict[str, Any]:
+        def clean(row: Dict[str, float]) -> Dict[str, float]:
+            return {k: (round(v, 6) if isinstance(v, float) else v) for k, v in row.items()}
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "wall_s": round(time.perf_counter() - self._t0, 6),
+            "cpu_s": round(time.process_time() - self._c0, 6),
+            "meta": self.meta,
+            "stages": {k: clean(v) for k, v in self.stages.items()},
+            "providers": {k: clean(v) for k, v in self.providers.items()},
+            "boards": {f"{p}/{b}": clean(v) for (p, b), v in self.boards.items()},
+        }
+
+    def summary(self) -> str:
+        """One line of per-stage wall times for the console."""
+        return " | ".join(f"{k} {v['wall_s']:.2f}s" for k, v in self.stages.items())
+
+    def write_json(self, path: str | Path, report: Optional[Dict[str, Any]] = None) -> None:
+        _atomic_write(path, json.dumps(report or self.report(), indent=2))
+
+    def write_prometheus(self, path: str | Path, report: Optional[Dict[str, Any]] = None) -> None:
+        rep = report or self.report()
+        lines = [
+            "# TYPE applypilot_run_wall_seconds gauge", f"applypilot_run_wall_seconds {rep['wall_s']}",
+            "# TYPE applypilot_run_cpu_seconds gauge", f"applypilot_run_cpu_seconds {rep['cpu_s']}",
+            "# TYPE applypilot_run_timestamp_seconds gauge",
+            f"applypilot_run_timestamp_seconds {datetime.fromisoformat(rep['finished_at']).timestamp():.0f}",
+        ]
+        groups = [
+            ("stage", rep["stages"], lambda k: {"stage": k},
+             ("wall_s", "cpu_s", "in", "out", "calls")),
+            ("provider", rep["providers"], lambda k: {"provider": k},
+             ("wall_s", "out", "requests", "bytes", "cache_hits", "not_modified", "retries", "throttled", "errors")),
+            ("board", rep["boards"], lambda k: dict(zip(("provider", "board"), k.split("/", 1))),
+             ("wall_s", "out", "requests", "bytes", "retries", "errors")),
+        ]
+        for kind, rows, labels, fields in groups:
+            for field in fields:
+                metric = f"applypilot_{kind}_{_PROM_NAMES.get(field, field)}"
+                lines.append(f"# TYPE {metric} gauge")
+                for key, row in rows.items():
+                    lbl = ",".join(f'{k}="{_prom_escape(v)}"' for k, v in labels(key).items())
+                    lines.append(f"{metric}{{{lbl}}} {row[field]}")
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+_PROM_NAMES = {"wall_s": "wall_seconds", "cpu_s": "cpu_seconds", "in": "items_in", "out": "items_out",
+               "bytes": "bytes_fetched", "requests": "requests", "calls": "calls"}
+
+def _prom_escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _atomic_write(path: str | Path, text: str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
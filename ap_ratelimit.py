@@ -0,0 +1,100 @@
+# Host-aware rate limiting and retries for ApplyPilot HTTP
+# - One token bucket per host; AIMD: the rate halves on 429/503 and creeps back up on success
+# - Retry-After (seconds or HTTP date) pauses the whole host, not just the request that got it
+# - Retries with exponential backoff + full jitter, capped per request and by a run-wide time budget
+from __future__ import annotations
+
+import asyncio, os, random, time
+from typing import Callable, Dict, Optional
+
+HOST_RATE = float(os.getenv("AP_HOST_RATE", "5"))            # requests/second per host (start and ceiling)
+HOST_BURST = int(os.getenv("AP_HOST_BURST", "5"))
+MIN_HOST_RATE = 0.2
+RETRY_ATTEMPTS = int(os.getenv("AP_RETRY_ATTEMPTS", "4"))     # tries per request, including the first
+RETRY_BASE_S = float(os.getenv("AP_RETRY_BASE_S", "0.5"))
+RETRY_MAX_S = float(os.getenv("AP_RETRY_MAX_S", "30"))
+RETRY_BUDGET_S = float(os.getenv("AP_RETRY_BUDGET_S", "120"))  # total backoff sleep allowed per run
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime  # HTTP-date form only; keeps the email package off startup
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - (time.time() if now is None else now))
+    except (TypeError, ValueError, IndexError):
+        return None
+
+class TokenBucket:
+    """Per-host bucket; waiters queue on one lock so a paused host holds back all its requests."""
+    def __init__(self, rate: float = HOST_RATE, burst: int = HOST_BURST, clock: Callable[[], float] = time.monotonic):
+        self.max_rate = self.rate = max(MIN_HOST_RATE, rate)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.clock = clock
+        self.updated = clock()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = self.clock()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        self.rate = max(MIN_HOST_RATE, self.rate / 2)
+        self.tokens = min(self.tokens, 0.0)
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, self.clock() + retry_after)
+
+    def succeeded(self) -> None:
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+class HostLimiter:
+    def __init__(self, rate: float = HOST_RATE, burst: int = HOST_BURST):
+        self.rate, self.burst = rate, burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        b = self._buckets.get(host)
+        if b is None:
+            b = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return b
+
+class RetryPolicy:
+    """Backoff schedule plus the run-wide budget; share one instance across all providers of a run."""
+    def __init__(self, attempts: int = RETRY_ATTEMPTS, base: float = RETRY_BASE_S, max_delay: float = RETRY_MAX_S,
+                 budget: float = RETRY_BUDGET_S, rng: Callable[[], float] = random.random):
+        self.attempts = max(1, attempts)
+        self.base, self.max_delay, self.budget = base, max_delay, budget
+        self.rng = rng
+        self.spent = 0.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = self.rng() * min(self.max_delay, self.base * 2 ** attempt)  # full jitter
+        return delay if retry_after is None else max(delay, retry_after)
+
+    def allow(self, attempt: int, delay: float) -> bool:
+        """Reserve `delay` seconds of budget for retry number `attempt + 1`, if any are left."""
+        if attempt + 1 >= self.attempts or self.spent + delay > self.budget:
+            return False
+        self.spent += delay
+        return True
@@ -0,0 +1,300 @@
+# Declarative scoring rules for ApplyPilot
+# - One rule file per role family (rules/*.toml; .json, and .yaml/.yml when PyYAML is installed):
+#   keywords, title classes and gates, term groups, body patterns, score parts, caps and penalties
+# - load_rules() validates the file into a plain spec and caches it as JSON in a per-user cache dir
+#   (AP_RULES_CACHE, default $XDG_CACHE_HOME/applypilot/rules), keyed by the file's hash, so a warm
+#   start skips parsing/validation (and the tomllib/yaml import). Nothing is written to the working dir
+# - compile_rules() turns a spec into a RuleSet: regexes compiled once (on first use, so --help pays for
+#   none), every term group behind one shared KeywordMatcher, and a ScoreSpec that both the per-job and
+#   the batch scorer interpret
+from __future__ import annotations
+
+import hashlib, json, os, re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple
+
+RULES_DIR = Path(__file__).resolve().parent / "rules"
+RULES_PATH = os.getenv("AP_RULES", str(RULES_DIR / "se.toml"))
+RULES_CACHE_DIR = os.getenv("AP_RULES_CACHE", os.path.join(
+    os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "applypilot", "rules"))  # '' disables
+_SPEC_VERSION = 1  # bump when the spec layout changes so cached specs are rebuilt
+
+# Named patterns the pipeline looks up; a rule file may leave any of them empty (never matches)
+TITLE_PATTERNS = ("keep", "systems", "adjacent", "loose", "architect", "junior", "harddrop", "drop",
+                  "senior", "senior_ok", "management")
+TEXT_PATTERNS = ("context", "clearance", "comp", "award", "travel")
+# Term groups the filters and the regex features rely on (literal anchors of the patterns above)
+REQUIRED_GROUPS = ("include", "exclude", "clearance_hint", "travel_hint", "comp_hint", "award_hint")
+_NEVER = "(?!)"
+
+class KeywordMatcher:
+    """Multi-category substring matcher compiled once per rule set.
+
+    `scan(text)` probes each distinct term once (terms shared by several groups,
+    e.g. "rfp" or "demo", are searched a single time) and returns {category: {hit
+    terms}} for the categories that hit. Containment links skip any term whose
+    registered substring already missed ("rfp responses" is never searched when
+    "rfp" is absent). Each probe is CPython's C substring search, which beats a
+    per-character automaton written in Python by a wide margin.
+    """
+    def __init__(self, groups: Dict[str, Sequence[str]]):
+        cats: Dict[str, set] = {}
+        for cat, terms in groups.items():
+            for t in terms:
+                cats.setdefault(t.lower(), set()).add(cat)
+        self.categories: Dict[str, frozenset] = {t: frozenset(c) for t, c in cats.items()}
+        self.groups: Dict[str, tuple] = {cat: tuple(dict.fromkeys(t.lower() for t in terms)) for cat, terms in groups.items()}
+        self._plans: Dict[Optional[tuple], tuple] = {}
+
+    def _plan(self, wanted: Optional[tuple]) -> tuple:
+        plan = self._plans.get(wanted)
+        if plan is None:
+            want = frozenset(wanted) if wanted else None
+            terms = [t for t, c in self.categories.items() if want is None or c & want]
+            base = tuple(t for t in terms if not any(u != t and u in t for u in terms))
+            dependent = tuple(sorted(
+                ((t, frozenset(u for u in base if u in t)) for t in terms if t not in base),
+                key=lambda tw: len(tw[0]),
+            ))
+            cats = {t: (self.categories[t] if want is None else self.categories[t] & want) for t in terms}
+            plan = self._plans[wanted] = (base, dependent, cats)
+        return plan
+
+    def scan(self, text: str, categories: Optional[tuple] = None) -> Dict[str, set]:
+        base, dependent, cats = self._plan(categories)
+        found = {t for t in base if t in text}
+        if found:
+            found.update([t for t, w in dependent if w <= found and t in text])
+        out: Dict[str, set] = {}
+        for t in found:
+            for c in cats[t]:
+                if c in out: out[c].add(t)
+                else: out[c] = {t}
+        return out
+
+    def any(self, text: str, category: str) -> bool:
+        """Short-circuiting gate: does any term of `category` occur in `text`?"""
+        return any(t in text for t in self.groups[category])
+
+class Patterns:
+    """Named regexes, each compiled on first attribute access and then kept as a plain attribute."""
+    def __init__(self, sources: Dict[str, str]):
+        self._sources = sources
+
+    def __getattr__(self, name: str) -> Pattern[str]:
+        try:
+            source = self.__dict__["_sources"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+        rx = re.compile(source or _NEVER)
+        setattr(self, name, rx)
+        return rx
+
+@dataclass(frozen=True)
+class TermRule:
+    """Points from one term group: `each` per distinct hit term (capped at `cap`), plus `any` if it hit at all."""
+    group: str
+    each: int = 0
+    any: int = 0
+    cap: Optional[int] = None
+
+    def points(self, n: int) -> int:
+        if not n:
+            return 0
+        per = self.each * n
+        return (per if self.cap is None else min(self.cap, per)) + self.any
+
+@dataclass(frozen=True)
+class ScorePart:
+    name: str
+    terms: Tuple[TermRule, ...]
+    cap: Optional[int] = None
+
+@dataclass(frozen=True)
+class Bands:
+    """Points for a number pulled from the posting: first `at_least`/`at_most` band that holds, else `default`."""
+    at_least: Tuple[Tuple[int, int], ...] = ()
+    at_most: Tuple[Tuple[int, int], ...] = ()
+    default: int = 0
+    unknown: int = 0
+
+    def points(self, v: Optional[int]) -> int:
+        if v is None:
+            return self.unknown
+        for threshold, pts in self.at_least:
+            if v >= threshold: return pts
+        for threshold, pts in self.at_most:
+            if v <= threshold: return pts
+        return self.default
+
+@dataclass(frozen=True)
+class TitleClass:
+    """Title class worth `points`; with `context`, that text pattern must also match the posting."""
+    pattern: str
+    points: int
+    context: Optional[str] = None
+
+@dataclass(frozen=True)
+class ScoreSpec:
+    titles: Tuple[TitleClass, ...]
+    parts: Tuple[ScorePart, ...]
+    salary: Bands
+    travel: Bands
+    award: int
+    clearance: int
+    too_senior: int
+    floor: int = 0
+    ceiling: int = 100
+
+    @property
+    def groups(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(t.group for p in self.parts for t in p.terms))
+
+@dataclass
+class RuleSet:
+    name: str
+    role_family: str
+    keywords: Tuple[str, ...]
+    notes: Tuple[str, ...]  # "signals we care about" lines for the email digest
+    rx: Patterns  # compiled patterns by name (TITLE_PATTERNS + TEXT_PATTERNS)
+    terms: Dict[str, Tuple[str, ...]]
+    matcher: KeywordMatcher
+    score: ScoreSpec
+    score_categories: Tuple[str, ...]  # term groups scanned for scoring (score parts + regex hints)
+    path: str
+    digest: str
+
+# ---- loading ----
+def _parse(path: Path, raw: bytes) -> Dict[str, Any]:
+    suffix = path.suffix.lower()
+    if suffix == ".toml":
+        import tomllib
+        return tomllib.loads(raw.decode("utf-8"))
+    if suffix == ".json":
+        return json.loads(raw)
+    if suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError("YAML rule files need PyYAML (pip install pyyaml)") from e
+        return yaml.safe_load(raw) or {}
+    raise ValueError(f"{path}: unsupported rule file type {suffix!r} (use .toml, .json or .yaml)")
+
+def _int(v: Any, where: str) -> int:
+    if isinstance(v, bool) or not isinstance(v, int):
+        raise ValueError(f"{where}: expected an integer, got {v!r}")
+    return v
+
+def _opt_int(v: Any, where: str) -> Optional[int]:
+    return None if v is None else _int(v, where)
+
+def _bands(d: Dict[str, Any], where: str) -> Dict[str, Any]:
+    return {
+        "at_least": [[_int(t, where), _int(p, where)] for t, p in d.get("at_least", [])],
+        "at_most": [[_int(t, where), _int(p, where)] for t, p in d.get("at_most", [])],
+        "default": _int(d.get("default", 0), where),
+        "unknown": _int(d.get("unknown", d.get("default", 0)), where),
+    }
+
+def validate(doc: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """Normalize a parsed rule file into the spec compile_rules() takes; ValueError on anything malformed."""
+    patterns = {**{k: "" for k in (*TITLE_PATTERNS, *TEXT_PATTERNS)}, **(doc.get("patterns") or {})}
+    unknown = set(patterns) - set(TITLE_PATTERNS) - set(TEXT_PATTERNS)
+    if unknown:
+        raise ValueError(f"{source}: unknown patterns {sorted(unknown)}")
+    for name, p in patterns.items():
+        if not isinstance(p, str):
+            raise ValueError(f"{source}: patterns.{name} must be a string")
+        try:
+            re.compile(p or _NEVER)
+        except re.error as e:
+            raise ValueError(f"{source}: patterns.{name}: {e}") from e
+
+    terms = {k: [str(t).lower() for t in v] for k, v in (doc.get("terms") or {}).items()}
+    missing = [g for g in REQUIRED_GROUPS if g not in terms]
+    if missing:
+        raise ValueError(f"{source}: missing term groups {missing}")
+
+    score = doc.get("score") or {}
+    titles = []
+    for i, t in enumerate(score.get("titles", [])):
+        where = f"{source}: score.titles[{i}]"
+        if t.get("pattern") not in TITLE_PATTERNS or (t.get("context") and t["context"] not in TEXT_PATTERNS):
+            raise ValueError(f"{where}: pattern must be one of {TITLE_PATTERNS}, context one of {TEXT_PATTERNS}")
+        titles.append({"pattern": t["pattern"], "points": _int(t.get("points"), where), "context": t.get("context") or None})
+    parts = []
+    for i, p in enumerate(score.get("parts", [])):
+        where = f"{source}: score.parts[{i}]"
+        rules = []
+        for r in p.get("terms", []):
+            if r.get("group") not in terms:
+                raise ValueError(f"{where}: unknown term group {r.get('group')!r}")
+            rules.append({"group": r["group"], "each": _int(r.get("each", 0), where), "any": _int(r.get("any", 0), where),
+                          "cap": _opt_int(r.get("cap"), where)})
+        parts.append({"name": str(p.get("name", f"part{i}")), "terms": rules, "cap": _opt_int(p.get("cap"), where)})
+    flags = score.get("flags") or {}
+    return {
+        "version": _SPEC_VERSION,
+        "name": str(doc.get("name") or Path(source).stem),
+        "role_family": str(doc.get("role_family") or ""),
+        "keywords": [str(k) for k in doc.get("keywords", [])],
+        "notes": [str(n) for n in doc.get("notes", [])],
+        "patterns": patterns,
+        "terms": terms,
+        "score": {
+            "titles": titles, "parts": parts,
+            "salary": _bands(score.get("salary") or {}, f"{source}: score.salary"),
+            "travel": _bands(score.get("travel") or {}, f"{source}: score.travel"),
+            "award": _int(flags.get("award", 0), f"{source}: score.flags.award"),
+            "clearance": _int(flags.get("clearance", 0), f"{source}: score.flags.clearance"),
+            "too_senior": _int(flags.get("too_senior", 0), f"{source}: score.flags.too_senior"),
+            "floor": _int(score.get("floor", 0), f"{source}: score.floor"),
+            "ceiling": _int(score.get("ceiling", 100), f"{source}: score.ceiling"),
+        },
+    }
+
+def compile_rules(spec: Dict[str, Any], path: str = "", digest: str = "") -> RuleSet:
+    s = spec["score"]
+    score = ScoreSpec(
+        titles=tuple(TitleClass(**t) for t in s["titles"]),
+        parts=tuple(ScorePart(p["name"], tuple(TermRule(**r) for r in p["terms"]), p["cap"]) for p in s["parts"]),
+        salary=Bands(**{k: tuple(map(tuple, v)) if k.startswith("at_") else v for k, v in s["salary"].items()}),
+        travel=Bands(**{k: tuple(map(tuple, v)) if k.startswith("at_") else v for k, v in s["travel"].items()}),
+        award=s["award"], clearance=s["clearance"], too_senior=s["too_senior"], floor=s["floor"], ceiling=s["ceiling"],
+    )
+    terms = {k: tuple(v) for k, v in spec["terms"].items()}
+    hints = ("clearance_hint", "travel_hint", "comp_hint", "award_hint")
+    return RuleSet(
+        name=spec["name"], role_family=spec["role_family"], keywords=tuple(spec["keywords"]), notes=tuple(spec["notes"]),
+        rx=Patterns(dict(spec["patterns"])),
+        terms=terms, matcher=KeywordMatcher(terms), score=score,
+        score_categories=tuple(dict.fromkeys((*score.groups, *hints))), path=path, digest=digest,
+    )
+
+def load_rules(path: str | Path = RULES_PATH, cache_dir: Optional[str] = RULES_CACHE_DIR) -> RuleSet:
+    """RuleSet for a rule file; the validated spec is reused from `cache_dir` while the file's bytes are unchanged."""
+    path = Path(path)
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw + f"|spec{_SPEC_VERSION}".encode()).hexdigest()[:16]
+    cached = Path(cache_dir) / f"{path.stem}-{digest}.json" if cache_dir else None
+    spec: Optional[Dict[str, Any]] = None
+    if cached is not None and cached.exists():
+        try:
+            spec = json.loads(cached.read_bytes())
+        except (OSError, ValueError):
+            spec = None  # unreadable cache entry: rebuild it
+    if not isinstance(spec, dict) or spec.get("version") != _SPEC_VERSION:
+        spec = validate(_parse(path, raw), str(path))
+        if cached is not None:
+            try:
+                cached.parent.mkdir(parents=True, exist_ok=True)
+                tmp = cached.with_name(f"{cached.name}.{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(spec), encoding="utf-8")
+                os.replace(tmp, cached)
+            except OSError:
+                pass  # unwritable cache dir: just compile from source every time
+    return compile_rules(spec, str(path), digest)
+
+def available_rules(directory: Path = RULES_DIR) -> List[Path]:
+    return sorted(p for p in directory.glob("*") if p.suffix.lower() in (".toml", ".json", ".yaml", ".yml"))
@@ -0,0 +1,117 @@
+# Persistent SQLite job store for incremental ApplyPilot runs
+# - Keyed by Job.id: first/last seen, content hash, last filter verdict + score
+# - Unchanged postings screened under the same parameters reuse their stored verdict
+# - Tracks what has already been emailed so digests only carry the delta
+from __future__ import annotations
+
+import hashlib, json, os, sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "./data/se_jobs.sqlite3")
+
+# Fields that feed the filters and the scorer; a change in any of them forces a rescore.
+# full_text is the uncapped description: Job.description may be cut to --desc-max, and an edit past the cut still counts
+HASH_FIELDS = ("title", "company", "location", "full_text", "tags", "is_remote")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    first_seen   TEXT NOT NULL,
+    last_seen    TEXT NOT NULL,
+    params_hash  TEXT,
+    kept         INTEGER,
+    score        INTEGER,
+    emailed_hash TEXT,
+    emailed_at   TEXT
+)
+"""
+
+def content_hash(job: Any) -> str:
+    payload = json.dumps([getattr(job, f, None) for f in HASH_FIELDS], ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+def params_hash(**params: Any) -> str:
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class JobStore:
+    """Thin wrapper over one SQLite file; all writes for a run happen in a few batched statements."""
+    def __init__(self, path: str | Path = JOBS_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(SCHEMA)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "JobStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _rows(self, ids: List[str]) -> Dict[str, sqlite3.Row]:
+        rows: Dict[str, sqlite3.Row] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            q = f"SELECT * FROM jobs WHERE id IN ({','.join('?' * len(chunk))})"
+            for r in self.conn.execute(q, chunk):
+                rows[r["id"]] = r
+        return rows
+
+    def split(self, jobs: List[Any], params: str) -> Tuple[List[Any], List[Tuple[Any, bool, Optional[int]]]]:
+        """Partition into (fresh, reused). Reused entries carry the stored (kept, score) verdict."""
+        rows = self._rows([j.id for j in jobs])
+        fresh: List[Any] = []
+        reused: List[Tuple[Any, bool, Optional[int]]] = []
+        for j in jobs:
+            r = rows.get(j.id)
+            if r is not None and r["params_hash"] == params and r["content_hash"] == content_hash(j) and r["kept"] is not None:
+                reused.append((j, bool(r["kept"]), r["score"]))
+            else:
+                fresh.append(j)
+        return fresh, reused
+
+    def record(self, jobs: Iterable[Any], verdicts: Dict[str, Tuple[bool, Optional[int]]], params: str) -> None:
+        """Upsert every job seen this run; `verdicts` maps id -> (kept, score) for freshly screened ones."""
+        now = _now()
+        seen, scored = [], []
+        for j in jobs:
+            h = content_hash(j)
+            seen.append((j.id, h, now, now))
+            if j.id in verdicts:
+                kept, score = verdicts[j.id]
+                scored.append((params, int(kept), score, h, j.id))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO jobs (id, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET last_seen = excluded.last_seen, content_hash = excluded.content_hash, "
+                "params_hash = CASE WHEN jobs.content_hash = excluded.content_hash THEN jobs.params_hash END",
+                seen,
+            )
+            self.conn.executemany(
+                "UPDATE jobs SET params_hash = ?, kept = ?, score = ?, content_hash = ? WHERE id = ?", scored
+            )
+
+    def pending_email(self, jobs: List[Any]) -> List[Any]:
+        """Jobs never emailed before, or whose content changed since they were emailed."""
+        rows = self._rows([j.id for j in jobs])
+        return [j for j in jobs if j.id not in rows or rows[j.id]["emailed_hash"] != content_hash(j)]
+
+    def mark_emailed(self, jobs: Iterable[Any]) -> None:
+        now = _now()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE jobs SET emailed_hash = ?, emailed_at = ? WHERE id = ?",
+                [(content_hash(j), now, j.id) for j in jobs],
+            )
@@ -0,0 +1,52 @@
+# Bounded top-K selection for ApplyPilot
+# - Min-heap of the best K items seen so far: O(n log K) time, O(K) memory
+# - Ties keep the earliest pushed item, so results match sorted(..., reverse=True)[:K]
+# - Works incrementally, so it plugs into the streaming pipeline as well as batch sort/--max
+from __future__ import annotations
+
+import heapq, itertools
+from typing import Any, Callable, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class TopK(Generic[T]):
+    """Keep the `k` largest items by `key` (k <= 0 keeps everything).
+
+    `push` returns the item that did not make (or fell out of) the cut, or None, so callers
+    can release per-item resources as soon as an item can no longer be selected.
+    """
+    def __init__(self, k: int, key: Callable[[T], Any]):
+        self.k = k
+        self.key = key
+        self._heap: List[Tuple[Any, int, T]] = []
+        self._seq = itertools.count()
+
+    def push(self, item: T) -> Optional[T]:
+        entry = (self.key(item), -next(self._seq), item)  # -seq: among equal keys the earlier item ranks higher
+        if self.k <= 0 or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return None
+        if entry[:2] <= self._heap[0][:2]:
+            return item
+        return heapq.heapreplace(self._heap, entry)[2]
+
+    def extend(self, items: Iterable[T]) -> "TopK[T]":
+        for item in items:
+            self.push(item)
+        return self
+
+    def items(self) -> List[T]:
+        """Selected items, best first."""
+        return [e[2] for e in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def clear(self) -> List[T]:
+        """Empty the selector, returning what it held."""
+        held = [e[2] for e in self._heap]
+        self._heap.clear()
+        return held
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __iter__(self):
+        return (e[2] for e in self._heap)
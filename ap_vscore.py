@@ -0,0 +1,119 @@
+# Vectorized scoring primitives for ApplyPilot
+# - TermMatrix: term groups compiled once into a vocabulary, a term x category membership matrix and a
+#   trigram lookup table over the terms' first three bytes
+# - hits(): sparse (COO) job x term hit matrix for a whole batch. Texts are packed into one byte buffer
+#   per chunk; a single table lookup on its trigram codes yields candidate positions, and each term's
+#   remaining bytes are verified with array comparisons. Terms shorter than three bytes fall back to
+#   `term in text` per posting
+# - counts(): distinct hit terms per category, (n_jobs, n_categories), summed straight from the COO rows
+# - regex_mask/regex_int: a Python `re` pattern over the batch (or a masked subset), so results match the scalar scorer
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterator, List, Optional, Pattern, Sequence, Tuple
+
+import numpy as np
+
+CHUNK_BYTES = int(os.getenv("AP_VSCORE_CHUNK_BYTES", str(8 << 20)))  # text bytes packed per pass (bounds temporaries)
+
+def _pack(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(NUL-separated UTF-8 buffer, start offset of each text). ASCII terms match bytes exactly as they match str."""
+    parts = [t.encode("utf-8") for t in texts]
+    lengths = np.fromiter((len(p) + 1 for p in parts), dtype=np.int64, count=len(parts))
+    starts = np.zeros(len(parts), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+    return np.frombuffer(b"\0".join(parts) + b"\0" * 64, dtype=np.uint8), starts
+
+def _chunks(texts: Sequence[str], budget: int) -> Iterator[Tuple[int, int]]:
+    lo, size = 0, 0
+    for i, t in enumerate(texts):
+        size += len(t) + 1
+        if size >= budget:
+            yield lo, i + 1
+            lo, size = i + 1, 0
+    if lo < len(texts):
+        yield lo, len(texts)
+
+class TermMatrix:
+    """{category: [terms]} compiled for batch matching (terms are lowercase; match lowercased texts)."""
+    def __init__(self, groups: Dict[str, Sequence[str]]):
+        self.categories: Tuple[str, ...] = tuple(groups)
+        self.terms: Tuple[str, ...] = tuple(dict.fromkeys(t.lower() for terms in groups.values() for t in terms))
+        index = {t: i for i, t in enumerate(self.terms)}
+        self.membership = np.zeros((len(self.terms), len(self.categories)), dtype=np.int32)
+        for c, terms in enumerate(groups.values()):
+            for t in terms:
+                self.membership[index[t.lower()], c] = 1
+        self.col: Dict[str, int] = {cat: c for c, cat in enumerate(self.categories)}
+
+        # Terms of 3+ ASCII bytes go through the trigram table; anything else is probed per text
+        self._by_trigram: Dict[int, List[Tuple[int, bytes]]] = {}
+        self._short: List[Tuple[int, str]] = []
+        for i, t in enumerate(self.terms):
+            b = t.encode("utf-8")
+            if len(b) >= 3 and t.isascii() and "\0" not in t and len(b) <= 64:
+                self._by_trigram.setdefault((b[0] << 16) | (b[1] << 8) | b[2], []).append((i, b))
+            else:
+                self._short.append((i, t))
+        self._lut = np.zeros(1 << 24, dtype=bool)
+        self._lut[list(self._by_trigram)] = True
+        self._codes = np.array(sorted(self._by_trigram), dtype=np.uint32)
+
+    def _hits_chunk(self, texts: Sequence[str], offset: int, rows: List[np.ndarray], cols: List[np.ndarray]) -> None:
+        buf, starts = _pack(texts)
+        tri = (buf[:-2].astype(np.uint32) << 16) | (buf[1:-1].astype(np.uint32) << 8) | buf[2:]
+        cand = np.flatnonzero(self._lut[tri])
+        codes = tri[cand]
+        del tri
+        order = np.argsort(codes, kind="stable")
+        cand, codes = cand[order], codes[order]
+        bounds = np.searchsorted(codes, np.stack([self._codes, self._codes + 1]))
+        for code, lo, hi in zip(self._codes.tolist(), bounds[0].tolist(), bounds[1].tolist()):
+            if lo == hi:
+                continue
+            at = cand[lo:hi]
+            for i, b in self._by_trigram[code]:
+                pos = at
+                for k in range(3, len(b)):
+                    pos = pos[buf[pos + k] == b[k]]
+                if len(pos):
+                    r = np.unique(np.searchsorted(starts, pos, side="right") - 1)
+                    rows.append(r + offset); cols.append(np.full(len(r), i, np.int64))
+        for i, t in self._short:
+            r = np.fromiter((k for k, text in enumerate(texts) if t in text), dtype=np.int64)
+            rows.append(r + offset); cols.append(np.full(len(r), i, np.int64))
+
+    def hits(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, cols) of the sparse hit matrix: texts[rows[k]] contains terms[cols[k]]."""
+        rows: List[np.ndarray] = [np.zeros(0, np.int64)]
+        cols: List[np.ndarray] = [np.zeros(0, np.int64)]
+        for lo, hi in _chunks(texts, CHUNK_BYTES):
+            self._hits_chunk(texts[lo:hi], lo, rows, cols)
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def counts(self, texts: Sequence[str]) -> np.ndarray:
+        rows, cols = self.hits(texts)
+        n, c = len(texts), len(self.categories)
+        cells = (rows[:, None] * c + np.arange(c))[self.membership[cols].astype(bool)]
+        return np.bincount(cells, minlength=n * c).reshape(n, c).astype(np.int32)
+
+def _rows(n: int, where: Optional[np.ndarray]) -> np.ndarray:
+    return np.arange(n) if where is None else np.flatnonzero(where)
+
+def regex_mask(texts: Sequence[str], rx: Pattern[str], where: Optional[np.ndarray] = None) -> np.ndarray:
+    """rx.search(text) is not None per text; only rows in `where` are searched (others are False)."""
+    out = np.zeros(len(texts), dtype=bool)
+    idx = _rows(len(texts), where)
+    search = rx.search
+    out[idx] = np.fromiter((search(texts[i]) is not None for i in idx.tolist()), dtype=bool, count=len(idx))
+    return out
+
+def regex_int(texts: Sequence[str], rx: Pattern[str], where: Optional[np.ndarray] = None, default: int = -1) -> np.ndarray:
+    """int(rx.search(text).group(1)) per text, `default` where it does not match or the row is not in `where`."""
+    out = np.full(len(texts), default, dtype=np.int64)
+    search = rx.search
+    for i in _rows(len(texts), where).tolist():
+        m = search(texts[i])
+        if m:
+            out[i] = int(m.group(1))
+    return out
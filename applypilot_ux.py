@@ -4,24 +4,34 @@ logger = logging.getLogger(__name__)
 # 🚀 ApplyPilot Ultra — Advanced Sales Engineer / Solutions Consultant Scraper
 # - Rich logs, --loose / --strict switches, robust scoring, safe email batching
 # - Email body now shows provider counts + the exact CLI flags used
+# - Heavy modules load on the path that needs them: httpx with the first fetch, rich with --print,
+#   email/smtplib with --email, numpy for dedupe / the numpy scorer, pandas/pyarrow for columnar output
 
 
-import argparse, csv, json, re, os, smtplib, time, logging
+import argparse, asyncio, csv, gzip, hashlib, html, json, queue, re, os, threading, time, logging, zlib
 from pathlib import Path
-from dataclasses import dataclass, asdict
+from contextlib import ExitStack
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from operator import attrgetter
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Iterable, Iterator, Callable, Tuple, AsyncIterator
 
-import httpx
 import sys
-from dotenv import load_dotenv
-from dateutil import parser as dtparse
-from rich.console import Console
-from rich.table import Table
+from ap_http import HttpSession, MAX_CONCURRENCY, PER_HOST_CONCURRENCY
+from ap_ratelimit import HostLimiter, RetryPolicy, HOST_RATE, RETRY_BUDGET_S
+from ap_httpcache import HttpCache, HTTP_CACHE_DIR, HTTP_CACHE_TTL
+from ap_store import JobStore, JOBS_DB_PATH, content_hash, params_hash
+from ap_dedupe import NearDupIndex, SignatureCache, canonical_company
+from ap_metrics import RunMetrics, RUN_REPORT_PATH, PROM_FILE_PATH
+from ap_topk import TopK
+from ap_dates import parse_ts, to_iso, to_day, recency_cutoff
+from ap_geo import GEO, WORLD, ISO_CODES
+from ap_rules import Bands, RuleSet, RULES_PATH, load_rules
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.table import Table
 
 # --- NO_ARCHITECT early guard (must be before any defs) ---
 try:
@@ -42,95 +52,70 @@ except Exception:
     pass
 # --- end guard ---
 
-try:
-    from rich.logging import RichHandler
-    logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[RichHandler()])
-except Exception:
+def setup_logging(rich: bool = False) -> None:
+    """Root logging for CLI runs; the RichHandler (and rich) only when rich output is wanted (--print)."""
+    if rich:
+        try:
+            from rich.logging import RichHandler
+            logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[RichHandler()])
+            return
+        except Exception:
+            pass
     logging.basicConfig(level=logging.INFO, format="%(message)s")
 
+def _load_dotenv() -> None:
+    """load_dotenv(), minus the python-dotenv import when there is no .env (same search: this file's dir upwards)."""
+    here = Path(__file__).resolve().parent
+    for d in (here, *here.parents):
+        if (d / ".env").is_file():
+            from dotenv import load_dotenv
+            load_dotenv(d / ".env")
+            return
+
 log = logging.getLogger("applypilot")
-load_dotenv()
+_load_dotenv()
 
-ROLE_FAMILY = "Sales Engineer / Solutions Consultant / Technical Sales"
 USER_AGENT   = "ApplyPilot-Ultra-Scraper/2.0 (+personal-use)"
 REQUEST_TIMEOUT = 45
-
-# ===================== Title logic (widened but safe) =====================
-TITLE_KEEP_RE = re.compile(
-    r"""(?ix)\b(
-        sales\s*engineer(?:ing)?|
-        solutions?\s*(engineer(?:ing)?|consultant|architect)|
-        (?:pre[-\s]?sales|presales)\s*engineer|
-        technical\s*(account\s*manager|sales\s*engineer)|
-        (customer|partner|field)\s*(engineer|solutions?)|
-        implementation\s*(specialist|engineer|consultant)|
-        (?:field\s+)?applications?\s*engineer|
-        customer\s*engineer|
-        (?:solution|technical)\s*consultant|
-        demo\s*engineer|
-        value\s*engineer
-    )\b"""
-)
-
-TITLE_SYSTEMS_RE = re.compile(r"(?i)\bsystems?\s*engineer\b")
-TITLE_SALESY_NEARBY_RE = re.compile(r"(?i)\b(sales|pre[-\s]?sales|presales|solutions?|demo|poc|proof\s*of\s*concept|rfi|rfp|technical\s*account)\b")
-
-TITLE_HARDDROP = re.compile(r"(?i)\b(head of|^head\b|regional manager|manager|management|mgr)\b")
-# Hard drops to avoid pure ops/dev roles & non-tech-sales
-TITLE_DROP_RE = re.compile(
-    r"""(?ix)\b(
-        account\s+executive|account\s+manager|devops|sre|help\s*desk|desktop\s*support|
-        support\s*technician|field\s*service|maintenance|hvac|biomedical|
-        analog|rf|pcb|semiconductor|solidworks|network\s+engineer|
-        systems?\s+administrator|security\s+operations|infrastructure\s+engineer|
-        data\s+(scientist|analyst)|project\s+manager|scrum\s+master|product\s+(manager|owner)|
-        frontend|back\s*end|full\s*stack|mobile\s+developer|game\s+developer|graphic\s+designer|
-        ui/ux\s+designer|marketing|recruiter|talent\s+acquisition|warehouse|logistics
-    )\b"""
-)
-
-# Seniority rules (default: avoid heavy senior unless explicitly jr/mid)
-SENIORITY_EXCLUDE = re.compile(r"(?i)\b(staff|principal|lead|head|director|vp|vice\s*president|chief|senior|sr\.?|manager|management|mgr)\b")
-SENIORITY_INCLUDE_HINTS = re.compile(r"(?i)\b(associate|jr|junior|mid|ii|iii|intermediate|entry|graduate|grad)\b")
-
-# ===================== Body signals =====================
-INCLUDE_SIGNALS = [
-    # presales motions
-    "discovery","requirements","poc","proof of concept","pilot","demo","solution design",
-    "architecture","rfi","rfp","scoping","sow","enablement","stakeholders","sales cycle",
-    "ae","account executive","objections","value","roi",
-    # tech
-    "api","webhook","integration","rest","graphql","sdk","cli","postman","curl",
-    "oauth","saml","sso","jwt","linux","python","sql","etl","aws","azure","gcp","docker","kubernetes",
-    # docs/diagrams
-    "documentation","rfp responses","sequence diagram","architecture diagram","runbook"
-]
-EXCLUDE_SIGNALS = [
-    "ticket queue","pager duty","on-call rotation","incident response","sla restore","patching",
-    "backup","rack","cabling","repair","troubleshoot hardware onsite","install equipment",
-    "no remote","onsite only","5 days onsite","help desk","service desk","desktop support"
-]
-
-CLEARANCE_RE = re.compile(r"(?i)\b(US citizens? only|must be a US citizen|ts/?sci|public trust|nv1|nv2|bpss|baseline)\b")
+# Cap on the description kept on each Job after normalization (0 = keep full text); full text stays in DESCRIPTIONS
+DESC_MAX_CHARS = int(os.getenv("DESC_MAX_CHARS", "0"))
+# Process-pool screening (--workers): below this many candidates the serial path is faster
+PARALLEL_MIN_JOBS = int(os.getenv("AP_PARALLEL_MIN_JOBS", "2000"))
+PARALLEL_CHUNK = int(os.getenv("AP_PARALLEL_CHUNK", "250"))
+# --stream: raw batches buffered between the fetch loop and the pipeline, and replay/page batch size
+STREAM_QUEUE = int(os.getenv("AP_STREAM_QUEUE", "8"))
+STREAM_BATCH = int(os.getenv("AP_STREAM_BATCH", "500"))
+# Widening fallback when nothing meets --min-score: keep this many best title matches
+FALLBACK_KEEP = 100
+# Scorer: "python" (compute_score per job) or "numpy" (score_batch over the whole batch; same scores).
+# numpy only pays off on large batches: on the replay fixtures it is about even at 2k postings and ~2x
+# faster from 5k-20k (ap_bench.py --score-parity). --stream scores STREAM_BATCH-sized batches, so keep python there.
+SCORE_BACKEND = os.getenv("AP_SCORE_BACKEND", "python")
+SCORE_BACKENDS = ("python", "numpy")
+# Bump whenever filter/scoring logic changes so stored verdicts in the job store are recomputed
+SCORE_VERSION = 1
+# Per-run stage/provider/board timings and fetch counters (see --report / --prom)
+METRICS = RunMetrics()
+
+# ===================== Rules (titles, signals, scoring) =====================
+# Title classes, body signals, term groups and the score formula come from a rule file (ap_rules;
+# default rules/se.toml, --rules / AP_RULES to switch role family). Patterns are compiled once per load.
+RULES: RuleSet = load_rules(RULES_PATH)
+
+def use_rules(path: str) -> RuleSet:
+    """Switch the process-wide rule set (no-op when `path` is already loaded)."""
+    global RULES
+    if path and os.path.abspath(path) != os.path.abspath(RULES.path):
+        RULES = load_rules(path)
+    return RULES
 
 # ===================== Geography & defaults =====================
-COUNTRY_ALIASES = {
-    "usa":"United States","us":"United States","u.s.":"United States",
-    "australia":"Australia","au":"Australia",
-    "anywhere":"Anywhere","remote":"Anywhere","worldwide":"Worldwide","global":"Global",
-    "eu":"Europe","emea":"EMEA","apac":"APAC","latam":"LATAM",
-}
+# Region names, aliases and hierarchy live in ap_geo (GEO resolves both locations and these lists)
 DEFAULT_INCLUDE = (
     "United States,Australia,New Zealand,Canada,United Kingdom,Europe,EU,EMEA,APAC,Remote,Anywhere,Worldwide,Global,"
     "Latin America,LATAM,South America,North America,Africa,Asia,Middle East"
 )
 
-DEFAULT_KEYWORDS = [
-    "sales engineer","solutions engineer","solutions consultant","pre-sales","presales",
-    "technical sales engineer","technical account manager","customer engineer",
-    "implementation engineer","field applications engineer","solutions architect","value engineer"
-]
-
 EMAIL_SUBJECT_PREFIX = os.getenv("EMAIL_SUBJECT_PREFIX", "[ApplyPilot]")
 EMAIL_BASE_SUBJECT   = os.getenv("EMAIL_SUBJECT", "SE/SC Job Digest (Ultra)")
 EMAIL_LABEL          = os.getenv("EMAIL_LABEL", "SE-Digest")
@@ -144,106 +129,167 @@ GREENHOUSE_COMPANIES = [
 LEVER_COMPANIES = [
     "loom","retool","samsara","rippling","brex","opendoor","angellist","airtable","robinhood","scaleai","benchling"
 ]
-
-@dataclass
-class Job:
-    @staticmethod
-    def fetch_smartrecruiters_jobs(lines):
-        try:
-            slugs = [ln for ln in lines if ln and not ln.startswith('#')]
-        except Exception:
-            slugs = []
-        if not slugs:
-            return []
-        headers = {"User-Agent": USER_AGENT}
-        client = httpx.Client(headers=headers, timeout=REQUEST_TIMEOUT)
-        jobs = []
-        for slug in slugs:
-            url = f"https://api.smartrecruiters.com/v1/companies/{slug}/postings?limit=100"
-            try:
-                r = client.get(url)
-                if r.status_code != 200:
-                    logger.debug(f"[smartrecruiters] {slug} -> {r.status_code}")
-                    continue
-                data = r.json()
-                for item in data.get('content', []):
-                    title = (item.get('name') or '').strip()
-                    ref = item.get('ref', {}) or {}
-                    link = ref.get('jobAdUrl') or ref.get('uri') or f"https://www.smartrecruiters.com/{slug}/{item.get('id','')}"
-                    dstr = item.get('releasedDate') or item.get('createdOn')
-                    posted_at = None
-                    if dstr:
-                        try:
-                            posted_at = dtparse.parse(dstr).date()
-                        except Exception:
-                            posted_at = None
-                    loc = item.get('location') or {}
-                    city = loc.get('city') or ''
-                    country = (loc.get('country') or {}).get('code') if isinstance(loc.get('country'), dict) else (loc.get('country') or '')
-                    location = ', '.join([p for p in [city, country] if p]).strip(', ')
-                    company = (item.get('company') or {}).get('identifier') or slug
-                    jobad = item.get('jobAd') or {}
-                    sections = jobad.get('sections') or {}
-                    jd = sections.get('jobDescription') or {}
-                    desc = jd.get('text') or None
-                    jobs.append(Job(title=title, company=company, location=location, posted_at=posted_at, url=link, description=desc, source='smartrecruiters', tags=[]))
-            except Exception as e:
-                logger.debug(f"[smartrecruiters] {slug} fetch error: {e}")
-        logger.info(f"[+] smartrecruiters: {len(jobs)}")
-        return jobs
-
+# SmartRecruiters company identifiers, one per line ('#' comments)
+SMARTRECRUITERS_FILE = os.getenv("SMARTRECRUITERS_FILE", "./data/smartrecruiters_companies.txt")
+SMARTRECRUITERS_PAGE = 100
+SMARTRECRUITERS_MAX_PAGES = int(os.getenv("AP_SMARTRECRUITERS_MAX_PAGES", "20"))
+
+class _JobSlots:
+    __slots__ = ("_features",)  # per-job JobFeatures cache (see features()); not a field, never serialized
+
+@dataclass(slots=True)
+class Job(_JobSlots):
+    """One posting. Slots, no per-instance __dict__; repeated strings (company, location, tags) are
+    interned and countries_allowed is the tuple GEO shares between postings with the same location."""
     id: str
     title: str
     company: str
     location: str
-    countries_allowed: List[str]
+    countries_allowed: Tuple[str, ...]
     is_remote: bool
     url: str
     source: str
-    posted_at: Optional[str]
+    posted_at: Optional[int]  # UTC epoch seconds (ap_dates.parse_ts); rendered as ISO-8601 in outputs
     description: Optional[str]
     tags: List[str]
     salary: Optional[str]
     score: Optional[int] = None
     remote_flag: Optional[str] = None
+    merged_ids: List[str] = field(default_factory=list)  # ids of postings collapsed into this one by dedupe
 
-def _parse_date(v: Optional[str]) -> Optional[str]:
-    if not v: return None
-    try: return dtparse.parse(v).astimezone(timezone.utc).isoformat()
-    except Exception: return None
+    def __post_init__(self) -> None:
+        if type(self.company) is str: self.company = sys.intern(self.company)
+        if type(self.location) is str: self.location = sys.intern(self.location)
+        self.tags = [sys.intern(t) if type(t) is str else t for t in self.tags or ()]
 
-def _canon_country(s: str) -> str:
-    key = s.strip().lower()
-    return COUNTRY_ALIASES.get(key, s.strip())
+    @property
+    def full_text(self) -> Optional[str]:
+        """Uncapped description (DESCRIPTIONS side store first); what ap_store.content_hash hashes."""
+        return DESCRIPTIONS.get(self.id) or self.description
 
-def _split_countries(s: Optional[str]) -> List[str]:
-    if not s: return []
-    parts = re.split(r"[,/;]|\bor\b|\band\b", s, flags=re.I)
-    return list(dict.fromkeys([_canon_country(p.strip()) for p in parts if p.strip()]))
+JOB_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(Job))
+_job_values = attrgetter(*JOB_FIELDS)
 
 def _travel_percent(text: str) -> Optional[int]:
-    m = re.search(r"(?i)(?:travel).*?(\d{1,2})\s?%", text)
+    m = RULES.rx.travel.search(text)
     if m:
         try: return int(m.group(1))
         except Exception: return None
     return None
 
 def _has_clearance_req(text: str) -> bool:
-    return bool(CLEARANCE_RE.search(text or ""))
+    return bool(RULES.rx.clearance.search(text or ""))
+
+# ===================== Normalization =====================
+_HTML_DROP_RE = re.compile(r"(?is)<(script|style)\b.*?</\1\s*>")
+_HTML_TAG_RE = re.compile(r"(?s)<[^>]*>")
+_WS_RE = re.compile(r"\s+")
+
+def html_to_text(s: Optional[str]) -> str:
+    """Plain text from (possibly entity-escaped) HTML: tags stripped, entities decoded, whitespace collapsed."""
+    if not s:
+        return ""
+    if "&" in s:
+        s = html.unescape(s)  # Greenhouse sends &lt;p&gt;-escaped markup
+    if "<" in s:
+        s = _HTML_TAG_RE.sub(" ", _HTML_DROP_RE.sub(" ", s))
+        if "&" in s:
+            s = html.unescape(s)
+    return _WS_RE.sub(" ", s).strip()
+
+class DescriptionStore:
+    """Side store for full descriptions when Job.description is capped (zlib-compressed, keyed by Job.id)."""
+    def __init__(self):
+        self._blobs: Dict[str, bytes] = {}
+    def put(self, job_id: str, text: str) -> None:
+        self._blobs[job_id] = zlib.compress(text.encode("utf-8"), 1)
+    def get(self, job_id: str) -> Optional[str]:
+        blob = self._blobs.get(job_id)
+        return zlib.decompress(blob).decode("utf-8") if blob is not None else None
+    def discard(self, job_id: str) -> None:
+        self._blobs.pop(job_id, None)
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+DESCRIPTIONS = DescriptionStore()
+
+def full_description(j: "Job") -> str:
+    """Full normalized description, even when the copy on the Job is capped."""
+    return DESCRIPTIONS.get(j.id) or j.description or ""
+
+def normalize_jobs(jobs: List["Job"], max_desc: int = DESC_MAX_CHARS) -> List["Job"]:
+    """Normalize provider output once: HTML -> text, collapsed whitespace, optional description cap."""
+    for j in jobs:
+        text = html_to_text(j.description)
+        if max_desc and len(text) > max_desc:
+            DESCRIPTIONS.put(j.id, text)
+            text = text[:max_desc]
+        j.description = text
+        j.title = sys.intern(_WS_RE.sub(" ", html.unescape(j.title or "")).strip())
+    return jobs
+
+# ===================== Providers (pooled async HTTPX) =====================
+def new_session(max_concurrency: int = MAX_CONCURRENCY, per_host: int = PER_HOST_CONCURRENCY,
+                cache: Optional[HttpCache] = None, host_rate: float = HOST_RATE,
+                retry_budget: float = RETRY_BUDGET_S) -> HttpSession:
+    return HttpSession(USER_AGENT, REQUEST_TIMEOUT, max_concurrency=max_concurrency, per_host=per_host,
+                       cache=cache, metrics=METRICS, limiter=HostLimiter(host_rate),
+                       retry=RetryPolicy(budget=retry_budget))
+
+async def _fetch_board(provider: str, org: str, fetch_board) -> List[Dict[str, Any]]:
+    """One company board under its metrics scope; a failing board yields []."""
+    try:
+        with METRICS.board(provider, org) as b:
+            rows = await fetch_board(org)
+            b.out = len(rows)
+            return rows
+    except Exception as e:
+        log.debug(f"[WARN] {provider}/{org} failed: {e}")
+        return []
+
+async def _gather_boards(provider: str, orgs: List[str], fetch_board) -> List[Dict[str, Any]]:
+    """Fetch every board concurrently; results keep the order of `orgs`."""
+    out: List[Dict[str, Any]] = []
+    for rows in await asyncio.gather(*(_fetch_board(provider, org, fetch_board) for org in orgs)):
+        out.extend(rows)
+    return out
+
+async def _stream_boards(provider: str, orgs: List[str], fetch_board) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Fetch every board concurrently, yielding each board's rows as soon as it completes."""
+    for fut in asyncio.as_completed([_fetch_board(provider, org, fetch_board) for org in orgs]):
+        rows = await fut
+        if rows:
+            yield rows
 
 class BaseProvider:
     name = "base"
-    def fetch(self, keywords: List[str]) -> List[Dict[str, Any]]: ...
+    def __init__(self, session: Optional[HttpSession] = None):
+        self.session = session
+    def bind(self, session: HttpSession) -> "BaseProvider":
+        self.session = session
+        return self
+    async def afetch(self, keywords: List[str]) -> List[Dict[str, Any]]: ...
+    async def astream(self, keywords: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Raw rows in batches as they arrive (--stream); single-request providers yield once."""
+        yield await self.afetch(keywords)
+    def fetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
+        """Standalone sync fetch on a private session (pipeline runs go through collect_jobs)."""
+        async def run() -> List[Dict[str, Any]]:
+            prev = self.session
+            async with new_session() as session:
+                try:
+                    return await self.bind(session).afetch(keywords)
+                finally:
+                    self.session = prev
+        return asyncio.run(run())
     def to_jobs(self, raw: List[Dict[str, Any]]) -> List["Job"]: ...
 
 class RemotiveAPI(BaseProvider):
     name = "remotive"
-    def fetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
+    async def afetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
         url = "https://remotive.com/api/remote-jobs"
-        with httpx.Client(timeout=REQUEST_TIMEOUT, headers={"User-Agent": USER_AGENT}) as client:
-            r = client.get(url, params={"search": ",".join(keywords) if keywords else "sales engineer"})
-            r.raise_for_status()
-            return r.json().get("jobs", [])
+        data = await self.session.get_json(url, params={"search": ",".join(keywords) if keywords else "sales engineer"})
+        return data.get("jobs", [])
     def to_jobs(self, raw: List[Dict[str, Any]]) -> List["Job"]:
         out: List[Job] = []
         for j in raw:
@@ -253,11 +299,11 @@ class RemotiveAPI(BaseProvider):
                 title=j.get("title") or "",
                 company=j.get("company_name") or "",
                 location=loc,
-                countries_allowed=_split_countries(loc) or ["Anywhere"],
+                countries_allowed=GEO.countries(loc),
                 is_remote=True,
                 url=j.get("url") or "",
                 source=self.name,
-                posted_at=_parse_date(j.get("publication_date")),
+                posted_at=parse_ts(j.get("publication_date")),
                 description=j.get("description"),
                 tags=list(j.get("tags") or []),
                 salary=j.get("salary"),
@@ -266,14 +312,11 @@ class RemotiveAPI(BaseProvider):
 
 class RemoteOKAPI(BaseProvider):
     name = "remoteok"
-    def fetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
-        with httpx.Client(timeout=REQUEST_TIMEOUT, headers={"User-Agent": USER_AGENT}) as client:
-            r = client.get("https://remoteok.com/api")
-            r.raise_for_status()
-            data = r.json()
+    async def afetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
+        data = await self.session.get_json("https://remoteok.com/api")
         rows = [d for d in data if isinstance(d, dict) and d.get("id")]
         out = []
-        kw = [k.lower() for k in (keywords or DEFAULT_KEYWORDS)]
+        kw = [k.lower() for k in (keywords or RULES.keywords)]
         for d in rows:
             text = " ".join([
                 str(d.get("position", "")),
@@ -293,11 +336,11 @@ class RemoteOKAPI(BaseProvider):
                 title=j.get("position") or "",
                 company=j.get("company") or "",
                 location=loc,
-                countries_allowed=_split_countries(loc) or ["Anywhere"],
+                countries_allowed=GEO.countries(loc),
                 is_remote=bool(j.get("remote", True)),
                 url=j.get("url") or ("https://remoteok.com/" + str(j.get("slug", ""))),
                 source=self.name,
-                posted_at=_parse_date(j.get("date")),
+                posted_at=parse_ts(j.get("date")),
                 description=j.get("description"),
                 tags=list(j.get("tags") or []),
                 salary=j.get("salary"),
@@ -306,20 +349,18 @@ class RemoteOKAPI(BaseProvider):
 
 class GreenhouseAPI(BaseProvider):
     name = "greenhouse"
-    def fetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
-        with httpx.Client(timeout=REQUEST_TIMEOUT, headers={"User-Agent": USER_AGENT}) as client:
-            for org in GREENHOUSE_COMPANIES:
-                url = f"https://boards-api.greenhouse.io/v1/boards/{org}/jobs"
-                try:
-                    r = client.get(url); r.raise_for_status()
-                    data = r.json()
-                    for j in data.get("jobs", []):
-                        j["_gh_org"] = org
-                        out.append(j)
-                except Exception:
-                    continue
-        return out
+    async def fetch_board(self, org: str) -> List[Dict[str, Any]]:
+        url = f"https://boards-api.greenhouse.io/v1/boards/{org}/jobs"
+        data = await self.session.get_json(url, params={"content": "true"})  # descriptions are only sent with content=true
+        rows = data.get("jobs", [])
+        for j in rows:
+            j["_gh_org"] = org
+        return rows
+    async def afetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
+        return await _gather_boards(self.name, GREENHOUSE_COMPANIES, self.fetch_board)
+    async def astream(self, keywords: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        async for rows in _stream_boards(self.name, GREENHOUSE_COMPANIES, self.fetch_board):
+            yield rows
     def to_jobs(self, raw: List[Dict[str, Any]]) -> List["Job"]:
         jobs: List[Job] = []
         for j in raw:
@@ -335,30 +376,27 @@ class GreenhouseAPI(BaseProvider):
             jobs.append(Job(
                 id=f"gh:{j.get('id')}:{company}",
                 title=title, company=company, location=location,
-                countries_allowed=_split_countries(location) or ["Anywhere"],
+                countries_allowed=GEO.countries(location),
                 is_remote=("remote" in location.lower() or "anywhere" in location.lower() or "global" in location.lower()),
                 url=url, source=self.name,
-                posted_at=_parse_date(j.get("updated_at") or j.get("created_at")),
+                posted_at=parse_ts(j.get("updated_at") or j.get("created_at")),
                 description=desc, tags=[], salary=None,
             ))
         return jobs
 
 class LeverAPI(BaseProvider):
     name = "lever"
-    def fetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
-        out: List[Dict[str, Any]] = []
-        with httpx.Client(timeout=REQUEST_TIMEOUT, headers={"User-Agent": USER_AGENT}) as client:
-            for org in LEVER_COMPANIES:
-                url = f"https://api.lever.co/v0/postings/{org}?mode=json"
-                try:
-                    r = client.get(url); r.raise_for_status()
-                    postings = r.json()
-                    for p in postings:
-                        p["_lever_org"] = org
-                        out.append(p)
-                except Exception:
-                    continue
-        return out
+    async def fetch_board(self, org: str) -> List[Dict[str, Any]]:
+        url = f"https://api.lever.co/v0/postings/{org}?mode=json"
+        postings = await self.session.get_json(url)
+        for p in postings:
+            p["_lever_org"] = org
+        return postings
+    async def afetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
+        return await _gather_boards(self.name, LEVER_COMPANIES, self.fetch_board)
+    async def astream(self, keywords: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        async for rows in _stream_boards(self.name, LEVER_COMPANIES, self.fetch_board):
+            yield rows
     def to_jobs(self, raw: List[Dict[str, Any]]) -> List["Job"]:
         jobs: List[Job] = []
         for p in raw:
@@ -368,151 +406,446 @@ class LeverAPI(BaseProvider):
             loc = (p.get("categories", {}) or {}).get("location") or p.get("workType") or "Remote"
             desc = p.get("descriptionPlain") or p.get("description") or ""
             tags = p.get("tags") or []
-            posted = None
-            if p.get("createdAt"):
-                try: posted = datetime.fromtimestamp(p["createdAt"] / 1000, tz=timezone.utc).isoformat()
-                except Exception: posted = None
+            posted = parse_ts(p.get("createdAt"))  # epoch millis
             jobs.append(Job(
                 id=f"lever:{p.get('id')}:{company}",
                 title=title, company=company, location=loc,
-                countries_allowed=_split_countries(loc) or ["Anywhere"],
+                countries_allowed=GEO.countries(loc),
                 is_remote=("remote" in (loc or "").lower() or "anywhere" in (loc or "").lower() or "global" in (loc or "").lower()),
                 url=url, source=self.name, posted_at=posted, description=desc, tags=list(tags), salary=None
             ))
         return jobs
 
-PROVIDERS: List[BaseProvider] = [RemotiveAPI(), RemoteOKAPI(), GreenhouseAPI(), LeverAPI()]
+def _title_candidate(title: str) -> bool:
+    """Widest title gate (as --loose): SmartRecruiters detail pages are only fetched for these."""
+    rx = RULES.rx
+    if rx.harddrop.search(title) or rx.drop.search(title):
+        return False
+    return bool(rx.keep.search(title) or rx.systems.search(title) or rx.adjacent.search(title) or rx.loose.search(title))
+
+def read_company_file(path: str | Path) -> List[str]:
+    try:
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+    except OSError as e:
+        log.debug(f"[smartrecruiters] no company list at {path}: {e}")
+        return []
+    return [ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith("#")]
+
+class SmartRecruitersAPI(BaseProvider):
+    """Offset-paginated postings per company; pages after the first are fetched concurrently.
+
+    The postings list carries no description, so the detail endpoint is fetched for title
+    candidates only (everything else would be dropped by filter_titles anyway).
+    """
+    name = "smartrecruiters"
+    base = "https://api.smartrecruiters.com/v1/companies"
+    def __init__(self, session: Optional[HttpSession] = None, companies: Optional[List[str]] = None):
+        super().__init__(session)
+        self._companies = companies
+    @property
+    def companies(self) -> List[str]:
+        return self._companies if self._companies is not None else read_company_file(SMARTRECRUITERS_FILE)
+    async def fetch_page(self, org: str, offset: int) -> Dict[str, Any]:
+        return await self.session.get_json(f"{self.base}/{org}/postings",
+                                           params={"limit": SMARTRECRUITERS_PAGE, "offset": offset})
+    async def fetch_detail(self, org: str, row: Dict[str, Any]) -> None:
+        try:
+            d = await self.session.get_json(f"{self.base}/{org}/postings/{row.get('id')}")
+        except Exception as e:
+            log.debug(f"[smartrecruiters] {org}/{row.get('id')} detail failed: {e}")
+            return
+        sections = ((d.get("jobAd") or {}).get("sections") or {})
+        texts = ((sections.get(k) or {}).get("text") for k in ("companyDescription", "jobDescription", "qualifications", "additionalInformation"))
+        row["_sr_description"] = "\n".join(t for t in texts if t)
+        row["_sr_url"] = d.get("postingUrl") or d.get("applyUrl")
+    async def fetch_board(self, org: str) -> List[Dict[str, Any]]:
+        first = await self.fetch_page(org, 0)
+        total = min(int(first.get("totalFound") or 0), SMARTRECRUITERS_PAGE * SMARTRECRUITERS_MAX_PAGES)
+        offsets = range(SMARTRECRUITERS_PAGE, total, SMARTRECRUITERS_PAGE)
+        pages = [first]
+        # One failed page must not cost the board the pages that did load
+        for off, page in zip(offsets, await asyncio.gather(*(self.fetch_page(org, off) for off in offsets),
+                                                           return_exceptions=True)):
+            if isinstance(page, BaseException):
+                log.warning(f"[WARN] smartrecruiters {org}: page at offset {off} failed: {page}")
+            else:
+                pages.append(page)
+        rows = [r for page in pages for r in (page.get("content") or [])]
+        for r in rows:
+            r["_sr_org"] = org
+        await asyncio.gather(*(self.fetch_detail(org, r) for r in rows if _title_candidate(r.get("name") or "")))
+        return rows
+    async def afetch(self, keywords: List[str]) -> List[Dict[str, Any]]:
+        return await _gather_boards(self.name, self.companies, self.fetch_board)
+    async def astream(self, keywords: List[str]) -> AsyncIterator[List[Dict[str, Any]]]:
+        async for rows in _stream_boards(self.name, self.companies, self.fetch_board):
+            yield rows
+    def to_jobs(self, raw: List[Dict[str, Any]]) -> List["Job"]:
+        jobs: List[Job] = []
+        for p in raw:
+            org = p.get("_sr_org", "")
+            loc = p.get("location") or {}
+            code = str(loc.get("country") or "").upper()
+            location = loc.get("fullLocation") or ", ".join(x for x in (loc.get("city"), loc.get("region"), code) if x)
+            remote = bool(loc.get("remote")) or "remote" in location.lower()
+            if not location:
+                location = "Remote" if remote else ""
+            country = ISO_CODES.get(code)
+            jobs.append(Job(
+                id=f"sr:{p.get('id')}:{org}",
+                title=p.get("name") or "",
+                company=(p.get("company") or {}).get("name") or org,
+                location=location,
+                countries_allowed=GEO.countries(country or location),
+                is_remote=remote,
+                url=p.get("_sr_url") or f"https://jobs.smartrecruiters.com/{org}/{p.get('id')}",
+                source=self.name,
+                posted_at=parse_ts(p.get("releasedDate") or p.get("createdOn")),
+                description=p.get("_sr_description") or "",
+                tags=[x for x in ((p.get(k) or {}).get("label") for k in ("function", "experienceLevel", "industry")) if x],
+                salary=None,
+            ))
+        return jobs
+
+PROVIDERS: List[BaseProvider] = [RemotiveAPI(), RemoteOKAPI(), GreenhouseAPI(), LeverAPI(), SmartRecruitersAPI()]
 
 # ===================== Filters & Scoring =====================
-def dedupe(jobs: List[Job]) -> List[Job]:
-    seen: Dict[str, Job] = {}
+def _merge_into(survivor: Job, others: List[Job]) -> Job:
+    for o in others:
+        if o is not survivor:
+            survivor.merged_ids.extend([o.id, *o.merged_ids])
+    return survivor
+
+def _pick_survivor(group: List[Job]) -> Job:
+    """First posting that has a date, else the first one seen."""
+    return next((j for j in group if j.posted_at is not None), group[0])
+
+def dedupe(jobs: List[Job], fuzzy: bool = True, sig_cache: Optional[SignatureCache] = None) -> List[Job]:
+    """Collapse duplicates: exact title + canonical company, then (fuzzy) MinHash/LSH near-duplicates."""
+    groups: Dict[str, List[Job]] = {}
     for j in jobs:
-        key = f"{(j.title or '').lower()}::{(j.company or '').lower()}" or (j.url or "").lower()
-        if key not in seen or (not seen[key].posted_at and j.posted_at):
-            seen[key] = j
-    return list(seen.values())
-
-def filter_geography_and_recency(jobs: List[Job], include: List[str], exclude: List[str], days: Optional[int]) -> List[Job]:
-    include_c = {_canon_country(c) for c in include if c}
-    exclude_c = {_canon_country(c) for c in exclude if c}
+        j.merged_ids = []
+        key = f"{(j.title or '').lower()}::{canonical_company(j.company)}"
+        groups.setdefault(key, []).append(j)
+    uniques = [_merge_into(_pick_survivor(g), g) for g in groups.values()]
+    if not fuzzy:
+        return uniques
+
+    index = NearDupIndex(sig_cache=sig_cache)
+    clusters: Dict[int, List[Job]] = {}
+    for j in uniques:
+        cid, _ = index.match_or_add(canonical_company(j.company), j.title or "", full_description(j))
+        clusters.setdefault(cid, []).append(j)
+    return [_merge_into(_pick_survivor(c), c) for c in clusters.values()]
+
+class StreamDeduper:
+    """Incremental dedupe for --stream: only exact keys and near-dup signatures are kept.
+
+    The first posting of a group wins (earlier postings have already moved downstream, so
+    survivors are not re-picked by posted_at and merged_ids stays empty).
+    """
+    def __init__(self, fuzzy: bool = True):
+        self._keys: set = set()
+        self._index = NearDupIndex() if fuzzy else None
+    def __call__(self, jobs: List[Job]) -> List[Job]:
+        out: List[Job] = []
+        for j in jobs:
+            j.merged_ids = []
+            company = canonical_company(j.company)
+            key = f"{(j.title or '').lower()}::{company}"
+            if key in self._keys:
+                continue
+            self._keys.add(key)
+            if self._index is not None:
+                _, is_new = self._index.match_or_add(company, j.title or "", full_description(j))
+                if not is_new:
+                    continue
+            out.append(j)
+        return out
+
+def filter_geography_and_recency(jobs: List[Job], include: List[str], exclude: List[str], days: Optional[int],
+                                 now: Optional[float] = None) -> List[Job]:
+    regions = GEO.compile(include, exclude)  # hierarchical include/exclude as region bitsets
+    cutoff = recency_cutoff(days, now) if days else None
     def ok(j: Job) -> bool:
-        allowed = set([_canon_country(c) for c in (j.countries_allowed or [])]) or {"Anywhere"}
-        if include_c and not (allowed & include_c) and "Anywhere" not in include_c:
+        if not regions.allows(GEO.mask(tuple(j.countries_allowed) or (WORLD,))):
             return False
-        if exclude_c and (allowed & exclude_c):
+        if cutoff is not None and j.posted_at is not None and j.posted_at <= cutoff:
             return False
-        if days and j.posted_at:
-            try:
-                age = (datetime.now(timezone.utc) - dtparse.parse(j.posted_at)).days
-                if age > days: return False
-            except Exception: pass
         return True
     return [j for j in jobs if ok(j)]
 
+class _lazy:
+    """Compute-once attribute (like functools.cached_property, minus its per-access lock on py<3.12)."""
+    def __init__(self, fn):
+        self.fn, self.name, self.__doc__ = fn, fn.__name__, fn.__doc__
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.fn(obj)
+        return value
+
+class JobFeatures:
+    """Text views and regex/term hits for one Job, each computed at most once.
+
+    Every filter stage and the scorer read from here instead of re-joining and
+    re-scanning the posting. Properties are lazy, so a job dropped by the title
+    filter never pays for the body scans.
+    """
+    def __init__(self, job: Job):
+        self.job = job
+        self.title = (job.title or "").strip()
+        self.description = full_description(job)
+        self._title_hits: Dict[str, bool] = {}
+        self._text_hits: Dict[str, bool] = {}
+
+    # --- text views ---
+    @_lazy
+    def filter_text(self) -> str:
+        j = self.job
+        return " ".join([j.title or "", j.company or "", " ".join(j.tags or []), self.description]).lower()
+
+    @_lazy
+    def score_text(self) -> str:
+        j = self.job
+        return " ".join([j.title or "", j.location or "", self.description, " ".join(j.tags or [])]).lower()
+
+    # --- title flags (RULES.rx title patterns) ---
+    def title_is(self, name: str) -> bool:
+        """Does title pattern `name` match? Cached per pattern."""
+        hit = self._title_hits.get(name)
+        if hit is None:
+            hit = self._title_hits[name] = bool(getattr(RULES.rx, name).search(self.title))
+        return hit
+
+    def text_is(self, name: str) -> bool:
+        """Does text pattern `name` match the scoring text? Cached per pattern."""
+        hit = self._text_hits.get(name)
+        if hit is None:
+            hit = self._text_hits[name] = bool(getattr(RULES.rx, name).search(self.score_text))
+        return hit
+
+    @_lazy
+    def title_keep(self) -> bool: return self.title_is("keep")
+    @_lazy
+    def title_systems(self) -> bool: return self.title_is("systems")
+    @_lazy
+    def title_adjacent(self) -> bool: return self.title_is("adjacent")
+    @_lazy
+    def title_loose(self) -> bool: return self.title_is("loose")
+    @_lazy
+    def title_harddrop(self) -> bool: return self.title_is("harddrop")
+    @_lazy
+    def title_drop(self) -> bool: return self.title_is("drop")
+    @_lazy
+    def title_senior_architect(self) -> bool:
+        return self.title_is("architect") and not self.title_is("junior")
+    @_lazy
+    def title_management(self) -> bool: return self.title_is("management")
+    @_lazy
+    def too_senior(self) -> bool:
+        return self.title_is("senior") and not self.title_is("senior_ok")
+
+    @_lazy
+    def title_points(self) -> int:
+        """First matching RULES title class; classes with a context pattern also need it in the posting."""
+        for tc in RULES.score.titles:
+            if self.title_is(tc.pattern) and (tc.context is None or self.text_is(tc.context)):
+                return tc.points
+        return 0
+
+    @_lazy
+    def fallback_points(self) -> int:
+        """Title class for the widening fallback (no context requirement)."""
+        for tc in RULES.score.titles:
+            if self.title_is(tc.pattern):
+                return tc.points
+        return 0
+
+    # --- body signals ---
+    @_lazy
+    def body_context(self) -> bool:
+        j = self.job
+        return bool(RULES.rx.context.search(" ".join([self.title, self.description, " ".join(j.tags or [])])))
+
+    @_lazy
+    def body_blocked(self) -> bool:
+        text = self.filter_text
+        return RULES.matcher.any(text, "exclude") or (RULES.matcher.any(text, "clearance_hint") and _has_clearance_req(text))
+
+    @_lazy
+    def has_include_signal(self) -> bool:
+        return RULES.matcher.any(self.filter_text, "include")
+
+    @_lazy
+    def requires_clearance(self) -> bool:
+        """Clearance check on title + description, as applied right before scoring."""
+        return _has_clearance_req(" ".join([self.job.title or "", self.description]))
+
+    @_lazy
+    def score_hits(self) -> Dict[str, set]:
+        return RULES.matcher.scan(self.score_text, RULES.score_categories)
+
+    @_lazy
+    def travel_percent(self) -> Optional[int]:
+        return _travel_percent(self.score_text) if "travel_hint" in self.score_hits else None
+
+    @_lazy
+    def salary_k(self) -> Optional[int]:
+        """Leading 2-3 digits of the first $/USD amount (i.e. thousands for "$120,000")."""
+        m = RULES.rx.comp.search(self.score_text) if "comp_hint" in self.score_hits else None
+        return int(m.group(1)) if m else None
+
+    @_lazy
+    def has_award(self) -> bool:
+        return "award_hint" in self.score_hits and bool(RULES.rx.award.search(self.score_text))
+
+    @_lazy
+    def score_clearance(self) -> bool:
+        return "clearance_hint" in self.score_hits and _has_clearance_req(self.score_text)
+
+def features(j: Job) -> JobFeatures:
+    f = getattr(j, "_features", None)
+    if f is None or f.job is not j:
+        f = j._features = JobFeatures(j)
+    return f
+
+def release_features(jobs: List[Job]) -> None:
+    """Drop cached features (they hold full-text views) once filtering and scoring are done."""
+    for j in jobs:
+        try: del j._features
+        except AttributeError: pass
+
 def filter_titles(jobs: List[Job], loose: bool) -> List[Job]:
     kept: List[Job] = []
     for j in jobs:
-        t = (j.title or "").strip()
+        f = features(j)
 
         # Hard drop obvious management/leadership titles
-        if TITLE_HARDDROP.search(t):
+        if f.title_harddrop:
             continue
 
         # Optional: drop Architect-heavy titles unless junior/associate
-        if NO_ARCHITECT and re.search(r"(?i)\b(architect|solutions? architect)\b", t):
-            if not re.search(r"(?i)\b(associate|jr|junior|entry|grad|ii)\b", t):
-                continue
-        if TITLE_DROP_RE.search(t):
+        if NO_ARCHITECT and f.title_senior_architect:
+            continue
+        if f.title_drop:
             continue
-        if TITLE_KEEP_RE.search(t):
+        if f.title_keep:
             kept.append(j); continue
-        if TITLE_SYSTEMS_RE.search(t):
-            hay = " ".join([t, j.description or "", " ".join(j.tags or [])])
-            if TITLE_SALESY_NEARBY_RE.search(hay) or loose:
-                kept.append(j); continue
-        if loose and re.search(r"(?i)\b(technical\s+consultant|integration\s+specialist|deployment\s+engineer|customer\s+success\s+engineer|partner\s+engineer)\b", t):
+        if f.title_systems and (loose or f.body_context):
+            kept.append(j); continue
+        if loose and f.title_loose:
             kept.append(j)
     return kept
 
 def filter_body_signals(jobs: List[Job], strict: bool) -> List[Job]:
     out: List[Job] = []
     for j in jobs:
-        hay = " ".join([j.title or "", j.company or "", " ".join(j.tags or []), j.description or ""]).lower()
-        if any(bad in hay for bad in EXCLUDE_SIGNALS) or _has_clearance_req(hay):
+        f = features(j)
+        if f.body_blocked:
             continue
-        if strict:
-            if any(sig in hay for sig in INCLUDE_SIGNALS):
-                out.append(j)
-        else:
-            out.append(j)
+        if strict and not f.has_include_signal:
+            continue
+        out.append(j)
     return out
 
 def filter_seniority(jobs: List[Job]) -> List[Job]:
     out = []
     for j in jobs:
-        t = (j.title or "")
+        f = features(j)
         # Hard-drop management phrases even if other filters pass
-        if re.search(r"(?i)(head of|regional manager|manager of)", t):
+        if f.title_management:
             continue
-        if SENIORITY_EXCLUDE.search(t) and not SENIORITY_INCLUDE_HINTS.search(t):
+        if f.too_senior:
             continue
         out.append(j)
     return out
 
 def compute_score(j: Job) -> int:
-    text = " ".join([j.title or "", j.location or "", j.description or "", " ".join(j.tags or [])]).lower()
-    # Title points
-    if TITLE_KEEP_RE.search(j.title or ""): title_points = 30
-    elif TITLE_SYSTEMS_RE.search(j.title or "") and TITLE_SALESY_NEARBY_RE.search(text): title_points = 22
-    elif re.search(r"(?i)\b(customer\s+success\s+engineer|partner\s+engineer|technical\s+consultant|integration\s+specialist|deployment\s+engineer|value\s+engineer)\b", j.title or ""):
-        title_points = 18
-    else:
-        title_points = 0
-
-    # Responsibilities
-    resp_terms = ["discovery","demo","poc","proof of concept","rfi","rfp","solution design","architecture","pilot","enablement","scoping","sow"]
-    responsibilities_points = min(25, sum(5 for t in resp_terms if t in text))
-
-    # Tech
-    tech_core = 8 if any(t in text for t in ["api","integration","webhook","rest","graphql"]) else 0
-    tech_lang = sum(1 for t in ["linux","python","sql"] if t in text)
-    tech_auth_cloud = sum(1 for t in ["oauth","saml","sso","aws","azure","gcp","docker","kubernetes","postman","curl","sdk","cli"] if t in text)
-    tech_points = min(20, tech_core + min(7, tech_lang) + min(5, tech_auth_cloud))
-
-    # Remote/eligibility
-    remote_points = 0
-    if any(t in text for t in ["remote","work from anywhere","distributed","hybrid","work from home"]): remote_points += 10
-    if any(t in text for t in ["remote (us)","remote (australia)","remote usa","remote us","remote au","anywhere in the us","anywhere in australia","global remote","united states","australia"]): remote_points += 5
-    remote_points = min(15, remote_points)
-
-    # Compensation (best-effort)
-    comp_points = 1
-    m = re.search(r"(?i)(?:\$|usd)\s?(\d{2,3})(?:[,\.]?\d{3})?", text)
-    if m:
-        num = int(m.group(1))
-        if num >= 90: comp_points = 5
-        elif num >= 70: comp_points = 3
-
-    # Travel
-    travel = _travel_percent(text)
-    travel_points = 5 if (travel is None or travel <= 25) else (3 if travel <= 30 else 0)
-
-    # Bonuses / penalties
-    bonus = 0
-    if re.search(r"(?i)\bred\s*dot\b|award", text): bonus += 3
-    if "automation" in text or "scripting" in text or "pipeline" in text: bonus += 3
-    if "documentation" in text or "rfp" in text: bonus += 3
-
-    penalty = 0
-    if "on-site only" in text or "onsite only" in text or "no remote" in text: penalty -= 25
-    if _has_clearance_req(text): penalty -= 30
-    if any(t in text for t in ["ticket queue","pager duty","incident response","rack and stack","install cable","break/fix"]):
-        penalty -= 18
-    if travel is not None and travel > 30: penalty -= 10
-    if SENIORITY_EXCLUDE.search(j.title or "") and not SENIORITY_INCLUDE_HINTS.search(j.title or ""): penalty -= 8
-
-    total = max(0, min(100, title_points + responsibilities_points + tech_points + remote_points + comp_points + travel_points + bonus + penalty))
-    return total
+    """Score one job by interpreting RULES.score: title class, capped term-group parts, salary and
+    travel bands, flag bonuses/penalties, clamped to [floor, ceiling]."""
+    f = features(j)
+    spec = RULES.score
+    hits = f.score_hits
+    total = f.title_points
+    for part in spec.parts:
+        points = 0
+        for r in part.terms:
+            if r.group in hits:
+                points += r.points(len(hits[r.group]))
+        total += points if part.cap is None or points <= part.cap else part.cap
+    total += spec.salary.points(f.salary_k) + spec.travel.points(f.travel_percent)
+    if f.has_award: total += spec.award
+    if f.score_clearance: total += spec.clearance
+    if f.too_senior: total += spec.too_senior
+    return max(spec.floor, min(spec.ceiling, total))
+
+@lru_cache(maxsize=4)
+def _score_terms(digest: str) -> Any:
+    """TermMatrix over the current rule set's scoring groups (`digest` keys the cache on RULES)."""
+    from ap_vscore import TermMatrix  # numpy/pandas only load when the batch scorer is used
+    return TermMatrix({cat: RULES.matcher.groups[cat] for cat in RULES.score_categories})
+
+def _bands_array(bands: Bands, v: Any) -> Any:
+    """Bands.points over an int array; negative values mean "not found" (bands.unknown)."""
+    import numpy as np
+    conds = [v >= t for t, _ in bands.at_least] + [v <= t for t, _ in bands.at_most]
+    points = [p for _, p in bands.at_least] + [p for _, p in bands.at_most]
+    return np.where(v < 0, bands.unknown, np.select(conds, points, bands.default) if conds else bands.default)
+
+def score_batch(jobs: List[Job]) -> Any:
+    """compute_score for a whole batch as one int array, from a job x term hit matrix.
+
+    Interprets the same RULES.score spec as compute_score; ap_bench.py --score-parity
+    checks the two agree. Term counts and point arithmetic are array operations; per-job
+    features, title classes, short terms and the regex fields are still Python per posting.
+    """
+    import numpy as np
+    from ap_vscore import regex_int, regex_mask
+    spec, rx = RULES.score, RULES.rx
+    fs = [features(j) for j in jobs]
+    texts = [f.score_text for f in fs]
+    terms = _score_terms(RULES.digest)
+    counts = terms.counts(texts)
+    def hit(cat: str) -> Any: return counts[:, terms.col[cat]]
+    def has(cat: str) -> Any: return hit(cat) > 0
+
+    def flag(name: str) -> Any:  # title flags: usually already cached by the filter stages
+        return np.fromiter((getattr(f, name) for f in fs), dtype=bool, count=len(fs))
+
+    # Title class: first match wins; context patterns only run on rows still unclassified
+    taken = np.zeros(len(fs), dtype=bool)
+    conds = []
+    for tc in spec.titles:
+        cls = np.fromiter((f.title_is(tc.pattern) for f in fs), dtype=bool, count=len(fs)) & ~taken
+        if tc.context:
+            cls &= regex_mask(texts, getattr(rx, tc.context), where=cls)
+        conds.append(cls)
+        taken |= cls
+    total = np.select(conds, [tc.points for tc in spec.titles], 0) if conds else np.zeros(len(fs), dtype=np.int64)
+
+    for part in spec.parts:
+        points = 0
+        for r in part.terms:
+            n = hit(r.group)
+            per = r.each * n if r.cap is None else np.minimum(r.cap, r.each * n)
+            points = points + np.where(n > 0, per + r.any, 0)
+        total = total + (points if part.cap is None else np.minimum(part.cap, points))
+
+    total = total + _bands_array(spec.salary, regex_int(texts, rx.comp, where=has("comp_hint")))
+    total = total + _bands_array(spec.travel, regex_int(texts, rx.travel, where=has("travel_hint")))
+    total = total + spec.award * regex_mask(texts, rx.award, where=has("award_hint"))
+    total = total + spec.clearance * regex_mask(texts, rx.clearance, where=has("clearance_hint"))
+    total = total + spec.too_senior * flag("too_senior")
+    return np.clip(total, spec.floor, spec.ceiling)
+
+def rank_key(j: Job) -> tuple:
+    """Final ordering: score, then recency."""
+    return ((j.score or 0), j.posted_at or 0)
+
+def fallback_key(j: Job) -> tuple:
+    """Ordering for the widening fallback: title points, then recency."""
+    return (features(j).fallback_points, j.posted_at or 0)
 
 def annotate_remote_flag(j: Job) -> str:
     loc = (j.location or "").lower()
@@ -520,49 +853,317 @@ def annotate_remote_flag(j: Job) -> str:
     if "hybrid" in loc: return "Hybrid"
     return "Onsite/Unknown"
 
+# ===================== Record / replay =====================
+def fixture_path(fixtures_dir: str | Path, provider: str) -> Path:
+    return Path(fixtures_dir) / f"{provider}.json.gz"
+
+def save_fixture(fixtures_dir: str | Path, provider: str, raw: List[Dict[str, Any]], keywords: List[str]) -> None:
+    """Write one provider's raw payload (what afetch returned) as gzipped JSON."""
+    path = fixture_path(fixtures_dir, provider)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {"provider": provider, "recorded_at": datetime.now(timezone.utc).isoformat(), "keywords": keywords, "rows": raw}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False)
+
+def load_fixture(fixtures_dir: str | Path, provider: str) -> List[Dict[str, Any]]:
+    path = fixture_path(fixtures_dir, provider)
+    if not path.exists():
+        log.info(f"[replay] no fixture for {provider} in {fixtures_dir}")
+        return []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)["rows"]
+
 # ===================== Orchestration =====================
-def collect_jobs(keywords: List[str]) -> List[Job]:
-    all_jobs: List[Job] = []
-    for p in PROVIDERS:
-        try:
-            raw = p.fetch(keywords); jobs = p.to_jobs(raw); all_jobs.extend(jobs)
-            log.info(f"[+] {p.name}: {len(jobs)}")
-        except Exception as e:
-            log.warning(f"[WARN] {p.name} failed: {e}")
-    return all_jobs
+async def _collect_jobs_async(keywords: List[str], max_concurrency: int, per_host: int,
+                             cache: Optional[HttpCache], desc_max: int,
+                             record: Optional[str], replay: Optional[str],
+                             host_rate: float = HOST_RATE, retry_budget: float = RETRY_BUDGET_S,
+                             progress: Optional[Callable[[str, int], None]] = None) -> List[Job]:
+    # One pooled session per pipeline run (and so one retry budget), injected into every provider and closed on exit
+    async with new_session(max_concurrency, per_host, cache=cache, host_rate=host_rate, retry_budget=retry_budget) as session:
+        async def run(p: BaseProvider) -> List[Job]:
+            try:
+                with METRICS.provider(p.name) as fetched:
+                    if replay:
+                        raw = load_fixture(replay, p.name)
+                    else:
+                        raw = await p.bind(session).afetch(keywords)
+                    fetched.out = len(raw)
+                if record:
+                    save_fixture(record, p.name, raw, keywords)
+                with METRICS.stage(f"parse:{p.name}", len(raw)) as parsed:
+                    jobs = normalize_jobs(p.to_jobs(raw), desc_max)
+                    parsed.out = len(jobs)
+                log.info(f"[+] {p.name}: {len(jobs)}")
+            except Exception as e:
+                log.warning(f"[WARN] {p.name} failed: {e}")
+                jobs = []
+            if progress is not None:
+                progress(p.name, len(jobs))
+            return jobs
+        results = await asyncio.gather(*(run(p) for p in PROVIDERS))
+    # Flatten in PROVIDERS order so dedupe stays deterministic
+    return [j for jobs in results for j in jobs]
+
+def collect_jobs(keywords: List[str], max_concurrency: int = MAX_CONCURRENCY, per_host: int = PER_HOST_CONCURRENCY,
+                 cache: Optional[HttpCache] = None, desc_max: int = DESC_MAX_CHARS,
+                 record: Optional[str] = None, replay: Optional[str] = None,
+                 host_rate: float = HOST_RATE, retry_budget: float = RETRY_BUDGET_S,
+                 progress: Optional[Callable[[str, int], None]] = None) -> List[Job]:
+    """Fetch (or replay from fixtures) every provider, then map + normalize to Jobs.
+
+    `record` writes each provider's raw payload to `<dir>/<provider>.json.gz`; `replay`
+    reads those files instead of touching the network. `progress(provider, n_jobs)` is
+    called as each provider finishes (n_jobs is 0 when it failed).
+    """
+    return asyncio.run(_collect_jobs_async(keywords, max_concurrency, per_host, cache, desc_max, record, replay,
+                                           host_rate, retry_budget, progress))
+
+def screen_jobs(jobs: List[Job], loose: bool, strict: bool, workers: int = 1) -> List[Job]:
+    """Title/body/seniority gates; survivors get `score` (None when a clearance requirement drops them)."""
+    if workers > 1 and len(jobs) >= PARALLEL_MIN_JOBS:
+        with METRICS.stage("screen_parallel", len(jobs)) as s:
+            jobs = _screen_parallel(jobs, loose, strict, workers)
+            s.out = len(jobs)
+        return jobs
+    with METRICS.stage("filter_titles", len(jobs)) as s:
+        jobs = filter_titles(jobs, loose=loose); s.out = len(jobs)
+    with METRICS.stage("filter_body_signals", len(jobs)) as s:
+        jobs = filter_body_signals(jobs, strict=strict); s.out = len(jobs)
+    with METRICS.stage("filter_seniority", len(jobs)) as s:
+        jobs = filter_seniority(jobs); s.out = len(jobs)
+    with METRICS.stage("compute_score", len(jobs)) as s:
+        if SCORE_BACKEND == "numpy" and jobs:
+            for j, score in zip(jobs, score_batch(jobs).tolist()):
+                j.score = None if features(j).requires_clearance else score
+        else:
+            for j in jobs:
+                j.score = None if features(j).requires_clearance else compute_score(j)
+        s.out = sum(j.score is not None for j in jobs)
+    return jobs
+
+def _screen_chunk(payload: tuple) -> List[tuple]:
+    """Worker side of _screen_parallel: (kept, score) per job, in input order."""
+    jobs, full_texts, loose, strict, no_architect, backend, rules = payload
+    global NO_ARCHITECT, SCORE_BACKEND
+    NO_ARCHITECT, SCORE_BACKEND = no_architect, backend  # spawn-started workers do not see the parent's CLI/env override
+    use_rules(rules)
+    for job_id, text in full_texts.items():
+        DESCRIPTIONS.put(job_id, text)
+    passed = {id(j) for j in screen_jobs(jobs, loose=loose, strict=strict)}
+    return [(True, j.score) if id(j) in passed else (False, None) for j in jobs]
+
+def _screen_parallel(jobs: List[Job], loose: bool, strict: bool, workers: int) -> List[Job]:
+    """Shard screening across a process pool; only (kept, score) tuples travel back."""
+    size = max(PARALLEL_CHUNK, -(-len(jobs) // (workers * 4)))
+    chunks = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    payloads = [
+        (chunk, {j.id: t for j in chunk if (t := DESCRIPTIONS.get(j.id)) is not None}, loose, strict, NO_ARCHITECT, SCORE_BACKEND,
+         RULES.path)
+        for chunk in chunks
+    ]
+    from concurrent.futures import ProcessPoolExecutor
+    kept: List[Job] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk, verdicts in zip(chunks, pool.map(_screen_chunk, payloads)):
+            for j, (ok, score) in zip(chunk, verdicts):
+                if ok:
+                    j.score = score
+                    kept.append(j)
+    return kept
 
-def apply_filters_and_score(jobs: List[Job], min_keep_score: int, loose: bool, strict: bool, console: Console) -> List[Job]:
+def screen_with_store(jobs: List[Job], loose: bool, strict: bool, store: Optional[JobStore] = None,
+                      rescore_all: bool = False, workers: int = 1) -> Tuple[List[Job], int]:
+    """screen_jobs, reusing stored verdicts for unchanged postings; returns (survivors in input order, rescored)."""
+    if store is None:
+        return screen_jobs(jobs, loose=loose, strict=strict, workers=workers), len(jobs)
+    # Incremental: only new/changed postings (or ones screened under other params) are rescored
+    params = params_hash(loose=loose, strict=strict, no_architect=NO_ARCHITECT, version=SCORE_VERSION, rules=RULES.digest)
+    fresh, reused = (list(jobs), []) if rescore_all else store.split(jobs, params)
+    passed = {id(j) for j in screen_jobs(fresh, loose=loose, strict=strict, workers=workers)}
+    verdicts = {j.id: (id(j) in passed, j.score if id(j) in passed else None) for j in fresh}
+    store.record(jobs, verdicts, params)
+    for j, kept, score in reused:
+        if kept:
+            j.score = score
+            passed.add(id(j))
+    return [j for j in jobs if id(j) in passed], len(fresh)  # keep input order for stable sorting
+
+def apply_filters_and_score(jobs: List[Job], min_keep_score: int, loose: bool, strict: bool, console: Console,
+                            store: Optional[JobStore] = None, rescore_all: bool = False, workers: int = 1) -> List[Job]:
     console.print(f"[dim]Filter: loose={loose} strict={strict} min={min_keep_score}[/dim]")
-    jobs = filter_titles(jobs, loose=loose)
-    jobs = filter_body_signals(jobs, strict=strict)
-    jobs = filter_seniority(jobs)
+    candidates = jobs
+    screened, rescored = screen_with_store(jobs, loose, strict, store=store, rescore_all=rescore_all, workers=workers)
+    if store is not None:
+        console.print(f"[dim]Incremental: rescored {rescored}, reused {len(jobs) - rescored}[/dim]")
 
     out: List[Job] = []
-    for j in jobs:
-        text = " ".join([j.title or "", j.description or ""])
-        if _has_clearance_req(text):
+    for j in screened:
+        if j.score is None:
             continue
-        j.score = compute_score(j)
         j.remote_flag = annotate_remote_flag(j)
-        if j.score is not None and j.score >= min_keep_score:
+        if j.score >= min_keep_score:
             out.append(j)
 
+    jobs = screened
     if not out and not strict:
         console.print("[yellow]No jobs met min score; widening by taking top title matches.[/yellow]")
-        temp = []
-        for j in jobs:
-            base = 0
-            if TITLE_KEEP_RE.search(j.title or ""): base = 30
-            elif TITLE_SYSTEMS_RE.search(j.title or ""): base = 22
-            elif re.search(r"(?i)\b(customer\s+success\s+engineer|partner\s+engineer|technical\s+consultant|integration\s+specialist|deployment\s+engineer|value\s+engineer)\b", j.title or ""):
-                base = 18
-            temp.append((base, j))
-        temp.sort(key=lambda x: (x[0], x[1].posted_at or ""), reverse=True)
-        out = [j for base, j in temp[:100]]
+        out = TopK(FALLBACK_KEEP, fallback_key).extend(jobs).items()
+    release_features(candidates)
     return out
 
+# ===================== Streaming (--stream) =====================
+def iter_raw_batches(keywords: List[str], max_concurrency: int = MAX_CONCURRENCY, per_host: int = PER_HOST_CONCURRENCY,
+                     cache: Optional[HttpCache] = None, record: Optional[str] = None,
+                     replay: Optional[str] = None, host_rate: float = HOST_RATE,
+                     retry_budget: float = RETRY_BUDGET_S) -> Iterator[Tuple[BaseProvider, List[Dict[str, Any]]]]:
+    """(provider, raw rows) batches as pages/boards arrive, fetched on a background event loop.
+
+    The bounded queue is the backpressure: when the pipeline falls behind, fetching pauses.
+    Closing the iterator early sets `stop`, so producers blocked on a full queue give up.
+    """
+    q: queue.Queue = queue.Queue(maxsize=STREAM_QUEUE)
+    done = object()
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        """Blocking put that gives up once the consumer has gone; False when it did."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    async def source(p: BaseProvider, session: HttpSession) -> AsyncIterator[List[Dict[str, Any]]]:
+        if replay:
+            rows = load_fixture(replay, p.name)
+            for i in range(0, len(rows), STREAM_BATCH):
+                yield rows[i:i + STREAM_BATCH]
+        else:
+            async for rows in p.bind(session).astream(keywords):
+                yield rows
+
+    async def produce(p: BaseProvider, session: HttpSession) -> None:
+        recorded: List[Dict[str, Any]] = []
+        try:
+            with METRICS.provider(p.name) as fetched:
+                fetched.out = 0
+                async for rows in source(p, session):
+                    fetched.out += len(rows)
+                    if record:
+                        recorded.extend(rows)
+                    if not await asyncio.to_thread(put, (p, rows)):
+                        return  # consumer closed early: drop the rest (and the --record fixture)
+            if record:
+                save_fixture(record, p.name, recorded, keywords)
+        except Exception as e:
+            log.warning(f"[WARN] {p.name} failed: {e}")
+
+    def fetcher() -> None:
+        async def run() -> None:
+            async with new_session(max_concurrency, per_host, cache=cache, host_rate=host_rate,
+                                   retry_budget=retry_budget) as session:
+                await asyncio.gather(*(produce(p, session) for p in PROVIDERS))
+        try:
+            asyncio.run(run())
+        except Exception as e:
+            log.warning(f"[WARN] fetch loop failed: {e}")
+        finally:
+            put(done)
+
+    t = threading.Thread(target=fetcher, name="applypilot-fetch", daemon=True)
+    t.start()
+    try:
+        while (item := q.get()) is not done:
+            yield item
+    finally:
+        stop.set()
+    t.join()
+
+def iter_job_batches(raw_batches: Iterable[Tuple[BaseProvider, List[Dict[str, Any]]]],
+                     desc_max: int = DESC_MAX_CHARS) -> Iterator[List[Job]]:
+    """Map + normalize each raw batch; raw dicts are dropped as soon as their Jobs exist."""
+    for p, raw in raw_batches:
+        try:
+            with METRICS.stage(f"parse:{p.name}", len(raw)) as s:
+                jobs = normalize_jobs(p.to_jobs(raw), desc_max)
+                s.out = len(jobs)
+        except Exception as e:
+            log.warning(f"[WARN] {p.name} batch failed: {e}")
+            continue
+        log.debug(f"[+] {p.name}: {len(jobs)}")
+        yield jobs
+
+def stream_pipeline(batches: Iterable[List[Job]], include: List[str], exclude: List[str], days: Optional[int],
+                    min_keep_score: int, loose: bool, strict: bool, max_keep: int = 0, fuzzy: bool = True,
+                    store: Optional[JobStore] = None, rescore_all: bool = False, workers: int = 1,
+                    sink: Optional[Callable[[Job], None]] = None) -> List[Job]:
+    """Streaming counterpart of dedupe -> geo/recency -> apply_filters_and_score -> sort/--max.
+
+    Only dedupe keys, the best `max_keep` jobs (0 = no cap) and, while nothing has met the
+    min score yet, FALLBACK_KEEP fallback candidates stay in memory. Every job that meets the
+    min score goes to `sink` as soon as it is scored. Returns the kept jobs, best first.
+    """
+    deduper = StreamDeduper(fuzzy)
+    top: TopK[Job] = TopK(max_keep, rank_key)
+    fallback: TopK[Job] = TopK(FALLBACK_KEEP, fallback_key)
+    held: set = set()  # ids of selected jobs; everything else releases its full description
+
+    def push(sel: TopK[Job], j: Job) -> None:
+        held.add(j.id)
+        dropped = sel.push(j)
+        if dropped is not None:
+            held.discard(dropped.id); DESCRIPTIONS.discard(dropped.id)
+
+    for batch in batches:
+        jobs = batch
+        with METRICS.stage("dedupe", len(jobs)) as s:
+            jobs = deduper(jobs); s.out = len(jobs)
+        with METRICS.stage("filter_geography_and_recency", len(jobs)) as s:
+            jobs = filter_geography_and_recency(jobs, include, exclude, days); s.out = len(jobs)
+        with METRICS.stage("apply_filters_and_score", len(jobs)) as s:
+            screened, _ = screen_with_store(jobs, loose, strict, store=store, rescore_all=rescore_all, workers=workers)
+            kept = 0  # met the min score in this batch; the stage metric sums over batches
+            for j in screened:
+                if j.score is not None:
+                    j.remote_flag = annotate_remote_flag(j)
+                    if j.score >= min_keep_score:
+                        for f in fallback.clear():
+                            held.discard(f.id); DESCRIPTIONS.discard(f.id)
+                        if sink is not None:
+                            sink(j)
+                        push(top, j)
+                        kept += 1
+                        continue
+                if not top and not strict:
+                    push(fallback, j)
+            s.out = kept
+        release_features(batch)
+        for j in batch:
+            if j.id not in held:
+                DESCRIPTIONS.discard(j.id)
+
+    if top:
+        return top.items()
+    if fallback:
+        log.info("No jobs met min score; widening by taking top title matches.")
+    return TopK(max_keep, rank_key).extend(fallback.items()).items()
+
 # ===================== Output =====================
+_MARKUP_RE = re.compile(r"\[/?(?:dim|bold|italic|red|green|yellow|blue|magenta|cyan)(?: [a-z ]+)?\]")
+
+class PlainConsole:
+    """The slice of rich.Console the pipeline uses (print), without importing rich: markup is stripped."""
+    def __init__(self, file: Optional[Any] = None):
+        self.file = file
+
+    def print(self, *objects: Any, sep: str = " ", end: str = "\n", **_: Any) -> None:
+        print(_MARKUP_RE.sub("", sep.join(str(o) for o in objects)), end=end, file=self.file or sys.stdout)
+
 def as_table(jobs: List[Job]) -> Table:
+    from rich.table import Table
     t = Table(show_header=True, header_style="bold")
     t.add_column("Title", min_width=28)
     t.add_column("Company", min_width=18)
@@ -573,26 +1174,201 @@ def as_table(jobs: List[Job]) -> Table:
     t.add_column("Source", min_width=12)
     t.add_column("URL", min_width=22)
     for j in jobs:
-        when = j.posted_at[:10] if j.posted_at else "—"
-        t.add_row(j.title, j.company, j.location, when, str(j.score or "—"), j.remote_flag or "—", j.source, j.url)
+        t.add_row(j.title, j.company, j.location, to_day(j.posted_at), str(j.score or "—"), j.remote_flag or "—", j.source, j.url)
     return t
 
 def ensure_dir(path: str | Path) -> None:
     Path(path).parent.mkdir(parents=True, exist_ok=True)
 
+def job_row(j: Job) -> Dict[str, Any]:
+    """Output row: the Job's fields (shallow, no asdict deep copy), with posted_at rendered as ISO-8601 UTC."""
+    row = dict(zip(JOB_FIELDS, _job_values(j)))
+    row["posted_at"] = to_iso(j.posted_at)
+    row["countries_allowed"] = list(j.countries_allowed)
+    return row
+
 def save_csv(jobs: List[Job], path: str) -> None:
-    ensure_dir(path)
-    fields = list(asdict(jobs[0]).keys()) if jobs else list(Job.__annotations__.keys())
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fields)
-        w.writeheader()
+    with CsvJobWriter(path) as w:
         for j in jobs:
-            w.writerow(asdict(j))
+            w.write(j)
 
 def save_json(jobs: List[Job], path: str) -> None:
-    ensure_dir(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump([asdict(j) for j in jobs], f, ensure_ascii=False, indent=2)
+    """JSON Lines for *.jsonl, otherwise a JSON array with one compact object per line."""
+    with JsonJobWriter(path) as w:
+        for j in jobs:
+            w.write(j)
+
+def save_parquet(jobs: List[Job], path: str) -> None:
+    with ParquetJobWriter(path) as w:
+        for j in jobs:
+            w.write(j)
+
+class JobWriter:
+    """Incremental job writer: rows go to disk on each `write`, nothing is buffered beyond the file object."""
+    def __init__(self, path: str, newline: Optional[str] = None):
+        ensure_dir(path)
+        self.path, self.count = path, 0
+        self._f = open(path, "w", newline=newline, encoding="utf-8")
+    def write(self, j: Job) -> None: ...
+    def close(self) -> None:
+        self._f.close()
+    def __enter__(self) -> "JobWriter":
+        return self
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+class CsvJobWriter(JobWriter):
+    def __init__(self, path: str):
+        super().__init__(path, newline="")
+        self._w = csv.DictWriter(self._f, fieldnames=JOB_FIELDS)
+        self._w.writeheader()
+    def write(self, j: Job) -> None:
+        self._w.writerow(job_row(j)); self.count += 1
+
+class JsonJobWriter(JobWriter):
+    """JSON Lines for *.jsonl, otherwise one compact object per line inside a JSON array."""
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.lines = path.endswith(".jsonl")
+        if not self.lines:
+            self._f.write("[")
+    def write(self, j: Job) -> None:
+        row = json.dumps(job_row(j), ensure_ascii=False)
+        self._f.write(row + "\n" if self.lines else ("\n" if not self.count else ",\n") + row)
+        self.count += 1
+    def close(self) -> None:
+        if not self.lines:
+            self._f.write("\n]\n")
+        self._f.close()
+
+# Parquet: everything a dashboard lists or filters on; the description column is only read on request
+PARQUET_ROW_GROUP = int(os.getenv("AP_PARQUET_ROW_GROUP", "10000"))
+PARQUET_LIST_COLUMNS = tuple(f for f in JOB_FIELDS if f != "description")
+_PARQUET_DICT_COLUMNS = ["company", "location", "source", "remote_flag", "countries_allowed", "tags"]
+
+def _pyarrow():
+    try:
+        import pyarrow as pa, pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+def parquet_schema(pa: Any) -> Any:
+    s, strs = pa.string(), pa.list_(pa.string())
+    return pa.schema([
+        ("id", s), ("title", s), ("company", s), ("location", s), ("countries_allowed", strs),
+        ("is_remote", pa.bool_()), ("url", s), ("source", s), ("posted_at", pa.timestamp("s", tz="UTC")),
+        ("tags", strs), ("salary", s), ("score", pa.int16()), ("remote_flag", s), ("merged_ids", strs),
+        ("description", s),  # last: its own column chunk, skipped by readers that project it out
+    ])
+
+class ParquetJobWriter(JobWriter):
+    """Parquet via pyarrow; rows are buffered as column values and written one row group (PARQUET_ROW_GROUP jobs) at a time.
+
+    `full_text` stores full_description() instead of the capped copy on the Job (read at `write`,
+    before a streaming pipeline releases it); `metadata` goes into the file's schema metadata.
+    """
+    def __init__(self, path: str, row_group: int = PARQUET_ROW_GROUP, full_text: bool = False,
+                 metadata: Optional[Dict[bytes, bytes]] = None):
+        pa, pq = _pyarrow()
+        ensure_dir(path)
+        self.path, self.count = path, 0
+        schema = parquet_schema(pa)
+        self._pa, self._schema, self._row_group = pa, schema.with_metadata(metadata) if metadata else schema, max(1, row_group)
+        self._full_text = full_text
+        self._w = pq.ParquetWriter(path, self._schema, compression="zstd", use_dictionary=_PARQUET_DICT_COLUMNS)
+        self._cols: Dict[str, List[Any]] = {name: [] for name in self._schema.names}
+        self._pending = 0
+    def write(self, j: Job) -> None:
+        for name, col in self._cols.items():
+            col.append(getattr(j, name))
+        if self._full_text:
+            self._cols["description"][-1] = full_description(j)
+        self.count += 1; self._pending += 1
+        if self._pending >= self._row_group:
+            self._flush()
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._w.write_table(self._pa.Table.from_pydict(self._cols, schema=self._schema))
+        self._cols = {name: [] for name in self._schema.names}
+        self._pending = 0
+    def close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            self._w.close()
+
+def load_parquet(path: str, with_description: bool = False) -> Any:
+    """DataFrame of a --parquet file; the description column is only decoded when asked for."""
+    import pandas as pd
+    return pd.read_parquet(path, columns=list(JOB_FIELDS if with_description else PARQUET_LIST_COLUMNS))
+
+# ===================== Snapshot (--from-snapshot) =====================
+# Normalized, pre-dedupe jobs of the last fetch (Parquet, full descriptions), so filters and
+# scoring can be re-tuned without touching the network
+SNAPSHOT_PATH = os.getenv("AP_SNAPSHOT_PATH", "./data/se_snapshot.parquet")
+_SNAPSHOT_META = b"applypilot.snapshot"
+
+class SnapshotWriter(ParquetJobWriter):
+    """Writes to `<path>.tmp` and swaps it into place only if the run finished, keeping the last good snapshot."""
+    def __init__(self, path: str, keywords: List[str]):
+        meta = {"created_at": datetime.now(timezone.utc).isoformat(), "keywords": keywords,
+                "providers": [p.name for p in PROVIDERS]}
+        self.final_path = path
+        super().__init__(f"{path}.tmp", full_text=True, metadata={_SNAPSHOT_META: json.dumps(meta).encode("utf-8")})
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        self.close()
+        if exc_type is None:
+            os.replace(self.path, self.final_path)
+        else:
+            Path(self.path).unlink(missing_ok=True)
+
+def open_snapshot(path: str, keywords: List[str]) -> Optional[SnapshotWriter]:
+    """SnapshotWriter, or None (with a warning) when pyarrow is missing: snapshots never fail a run."""
+    try:
+        return SnapshotWriter(path, keywords)
+    except RuntimeError as e:
+        log.warning(f"[WARN] snapshot skipped: {e}")
+        return None
+
+def save_snapshot(jobs: List[Job], path: str, keywords: List[str]) -> None:
+    w = open_snapshot(path, keywords)
+    if w is None:
+        return
+    with w:
+        for j in jobs:
+            w.write(j)
+
+def tee_snapshot(batches: Iterable[List[Job]], w: SnapshotWriter) -> Iterator[List[Job]]:
+    """Pass job batches through, writing each job to the snapshot before the pipeline sees it."""
+    for batch in batches:
+        for j in batch:
+            w.write(j)
+        yield batch
+
+def load_snapshot(path: str, desc_max: int = DESC_MAX_CHARS) -> Tuple[List[Job], Dict[str, Any]]:
+    """(jobs, snapshot metadata) as collect_jobs returned them for the snapshotted run; descriptions re-capped at desc_max."""
+    pa, pq = _pyarrow()
+    table = pq.read_table(path, columns=[f for f in JOB_FIELDS if f not in ("score", "remote_flag", "merged_ids")])
+    meta = json.loads((table.schema.metadata or {}).get(_SNAPSHOT_META, b"{}"))
+    cols = {name: table.column(name) for name in table.column_names}
+    cols["posted_at"] = cols["posted_at"].cast(pa.timestamp("s", tz="UTC")).cast(pa.int64())  # Parquet stores ms
+    names = list(cols)
+    shared: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    jobs: List[Job] = []
+    for values in zip(*(cols[n].to_pylist() for n in names)):
+        row = dict(zip(names, values))
+        countries = tuple(row["countries_allowed"] or ())
+        row["countries_allowed"] = shared.setdefault(countries, countries)
+        row["tags"] = row["tags"] or []
+        j = Job(**row)
+        text = j.description or ""
+        if desc_max and len(text) > desc_max:
+            DESCRIPTIONS.put(j.id, text)
+            j.description = text[:desc_max]
+        jobs.append(j)
+    return jobs, meta
 
 # ===================== Mail =====================
 def _env_bool(name: str, default: bool = False) -> bool:
@@ -613,6 +1389,11 @@ def send_email_with_attachment(subject: str, body: str, attachment_path: str) ->
     reply_to  = os.getenv("REPLY_TO") or from_email
     if not (smtp_host and smtp_user and smtp_pass and to_email):
         raise RuntimeError("SMTP config missing")
+    import smtplib
+    from email import encoders
+    from email.mime.base import MIMEBase
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
     msg = MIMEMultipart()
     msg["From"], msg["To"], msg["Subject"] = from_email, to_email, subject
     msg.add_header("Reply-To", reply_to)
@@ -636,12 +1417,10 @@ def send_email_with_attachment(subject: str, body: str, attachment_path: str) ->
 def build_cover_message(provider_summary: str = "", flags_summary: str = "") -> str:
     return f"""Hello,
 
-Attached is today’s batch of {ROLE_FAMILY} opportunities.
+Attached is today’s batch of {RULES.role_family} opportunities.
 
 Signals we care about:
-- Presales motions: discovery/demo/POC/RFI-RFP
-- Tech: APIs/integrations, auth (OAuth/SAML/SSO), Linux/Python/SQL, cloud
-- Remote friendly, US or AU eligible preferred
+{chr(10).join("- " + n for n in RULES.notes)}
 
 Work rights: US green card + SSN; Australian citizen.
 
@@ -650,63 +1429,151 @@ Work rights: US green card + SSN; Australian citizen.
 """
 
 # ===================== CLI / Main =====================
-def parse_args() -> argparse.Namespace:
-    ap = argparse.ArgumentParser(description=f"ApplyPilot Ultra — {ROLE_FAMILY}")
-    ap.add_argument("-k","--keywords", default=",".join(DEFAULT_KEYWORDS), help="Comma-separated keywords")
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=f"ApplyPilot Ultra — {RULES.role_family}")
+    ap.add_argument("-k","--keywords", default="", help="Comma-separated keywords (default: the rule set's keywords)")
+    ap.add_argument("--rules", default=RULES_PATH, help="Scoring rule file (rules/*.toml; see ap_rules.py)")
     ap.add_argument("--include-countries", default=DEFAULT_INCLUDE, help="Comma-separated countries/regions to include")
     ap.add_argument("--exclude-countries", default="", help="Comma-separated countries/regions to exclude")
     ap.add_argument("--days", type=int, default=int(os.getenv("MAX_AGE_DAYS","30")), help="Only include jobs posted within N days (0 = all)")
     ap.add_argument("--max", type=int, default=4000, help="Max rows to keep")
     ap.add_argument("--print", action="store_true", help="Print a table")
     ap.add_argument("-o","--csv", default=os.getenv("JOBS_CSV_PATH","./data/se_filtered_jobs.csv"), help="CSV path")
-    ap.add_argument("--json", default=os.getenv("RAW_JOBS_CSV","./data/se_jobs_all.json"), help="JSON path")
+    ap.add_argument("--json", default=os.getenv("RAW_JOBS_CSV","./data/se_jobs_all.json"), help="JSON path (*.jsonl writes JSON Lines)")
+    ap.add_argument("--parquet", default=os.getenv("JOBS_PARQUET_PATH", ""),
+                    help="Also write Parquet here (needs pyarrow; dashboards can skip the description column)")
     ap.add_argument("--email", action="store_true", help="Send email batches")
     ap.add_argument("--loose", action="store_true", help="Loosen filters (skip body-signal gate; widen title keepers)")
     ap.add_argument("--strict", action="store_true", help="Strict body-signal requirement")
     ap.add_argument("--min-score", type=int, default=int(os.getenv("MIN_KEEP_SCORE","50")), help="Minimum score to keep (default 50)")
-    return ap.parse_args()
+    ap.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Max in-flight HTTP requests across all providers")
+    ap.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY, help="Max in-flight HTTP requests per host")
+    ap.add_argument("--host-rate", type=float, default=HOST_RATE,
+                    help="Requests/second per host (token bucket; halved on 429/503, recovers on success)")
+    ap.add_argument("--retry-budget", type=float, default=RETRY_BUDGET_S,
+                    help="Total seconds this run may spend backing off before retries stop")
+    ap.add_argument("--http-cache", default=HTTP_CACHE_DIR, help="On-disk conditional-GET cache dir ('' disables)")
+    ap.add_argument("--cache-ttl", type=int, default=HTTP_CACHE_TTL, help="Serve cached responses younger than N seconds without revalidating")
+    ap.add_argument("--desc-max", type=int, default=DESC_MAX_CHARS, help="Cap stored descriptions at N chars after HTML cleanup (0 = no cap)")
+    ap.add_argument("--workers", type=int, default=int(os.getenv("AP_WORKERS", "1")),
+                    help=f"Screen/score in N processes (used for >= {PARALLEL_MIN_JOBS} candidates)")
+    ap.add_argument("--score-backend", choices=SCORE_BACKENDS, default=SCORE_BACKEND,
+                    help="compute_score per job, or numpy: one vectorized pass over each batch (identical scores; faster from a few thousand postings per batch)")
+    ap.add_argument("--no-fuzzy-dedupe", action="store_true", help="Only collapse exact title+company duplicates")
+    ap.add_argument("--record", default="", help="Save raw provider payloads to DIR/<provider>.json.gz")
+    ap.add_argument("--replay", default="", help="Replay raw provider payloads from DIR instead of fetching")
+    ap.add_argument("--store", default=JOBS_DB_PATH, help="SQLite job store for incremental runs ('' disables)")
+    ap.add_argument("--full", action="store_true", help="Ignore stored verdicts: rescore everything and email the full result")
+    ap.add_argument("--stream", action="store_true",
+                    help="Stream providers -> filters -> writers in bounded memory (--json gets every kept job as it is scored; *.jsonl for JSON Lines)")
+    ap.add_argument("--snapshot", default=SNAPSHOT_PATH,
+                    help="Save each run's normalized pre-filter jobs here for --from-snapshot (needs pyarrow; '' disables)")
+    ap.add_argument("--from-snapshot", default="",
+                    help="Skip fetching: re-run dedupe, filters and scoring on a saved --snapshot")
+    ap.add_argument("--serve", "--daemon", dest="serve", action="store_true",
+                    help="Stay resident: refetch each provider on its schedule, rewrite outputs/alerts only on change")
+    ap.add_argument("--schedule", default="", help=f"Per-provider refresh intervals for --serve (default: {SERVE_SCHEDULE})")
+    ap.add_argument("--serve-cycles", type=int, default=0, help="Exit --serve after N wake-ups (0 = run until stopped)")
+    ap.add_argument("--report", default=RUN_REPORT_PATH, help="Write a JSON run report (stage/provider/board timings, counts, bytes; '' disables)")
+    ap.add_argument("--prom", default=PROM_FILE_PATH, help="Also write run metrics in Prometheus text format to this path")
+    args = ap.parse_args(argv)
+    try:
+        schedule = serve_schedule(args.schedule) if args.serve else parse_schedule(args.schedule)
+    except ValueError as e:
+        ap.error(f"{'AP_SERVE_SCHEDULE/--schedule' if args.serve else '--schedule'}: {e}")
+    if args.serve and not schedule:
+        ap.error("--serve: the schedule names no providers (set --schedule or AP_SERVE_SCHEDULE)")
+    return args
 
 def build_subject(score_avg: int, count: int, batch_idx: int, batch_total: int) -> str:
     return f"{EMAIL_SUBJECT_PREFIX} {EMAIL_BASE_SUBJECT} — Batch {batch_idx}/{batch_total} ({count} roles, avg={score_avg})"
 
-def main() -> int:
-    console = Console()
-    args = parse_args()
-
-    keywords  = [s.strip() for s in (args.keywords or "").split(",") if s.strip()]
-    include_c = [s.strip() for s in (args.include_countries or "").split(",") if s.strip()]
-    exclude_c = [s.strip() for s in (args.exclude_countries or "").split(",") if s.strip()]
-
-    console.print(f"[dim]Collecting with providers={len(PROVIDERS)}[/dim]")
-    jobs = collect_jobs(keywords)
-    console.print(f"Collected: {len(jobs)}")
-
-    jobs = dedupe(jobs); console.print(f"After dedupe: {len(jobs)}")
-    jobs = filter_geography_and_recency(jobs, include_c, exclude_c, None if args.days == 0 else args.days)
+def run_stream(args: argparse.Namespace, console: Console, keywords: List[str], include_c: List[str],
+               exclude_c: List[str], cache: Optional[HttpCache], store: Optional[JobStore]) -> List[Job]:
+    """--stream: providers -> normalize -> dedupe/filters/score -> writers, never holding the full job list."""
+    console.print(f"[dim]Filter: loose={args.loose} strict={args.strict} min={args.min_score} (streaming)[/dim]")
+    json_out = JsonJobWriter(args.json) if args.json else None
+    try:
+        with METRICS.stage("stream") as s, ExitStack() as stack:
+            raw = iter_raw_batches(keywords, args.concurrency, args.per_host, cache,
+                                   record=args.record or None, replay=args.replay or None,
+                                   host_rate=args.host_rate, retry_budget=args.retry_budget)
+            batches = iter_job_batches(raw, args.desc_max)
+            snap = open_snapshot(args.snapshot, keywords) if args.snapshot else None
+            if snap is not None:
+                batches = tee_snapshot(batches, stack.enter_context(snap))
+            jobs = stream_pipeline(batches, include_c, exclude_c,
+                                   None if args.days == 0 else args.days, args.min_score, args.loose, args.strict,
+                                   max_keep=args.max, fuzzy=not args.no_fuzzy_dedupe, store=store,
+                                   rescore_all=args.full, workers=args.workers,
+                                   sink=json_out.write if json_out else None)
+            s.out = len(jobs)
+        if json_out and not json_out.count:
+            for j in jobs:  # widened fallback: nothing met the min score while streaming
+                json_out.write(j)
+    finally:
+        if json_out:
+            json_out.close()
+
+    counts = {k: v["out"] for k, v in METRICS.stages.items()}
+    console.print(f"Collected: {sum(v for k, v in counts.items() if k.startswith('parse:'))}")
+    console.print(f"After dedupe: {counts.get('dedupe', 0)}")
+    console.print(f"After geo/date: {counts.get('filter_geography_and_recency', 0)}")
+    console.print(f"[dim]Final: {len(jobs)}[/dim]")
+    if json_out:
+        print(f"[OK] JSON written to {args.json} ({json_out.count} jobs)")
+    if args.csv:
+        with METRICS.stage("save_csv", len(jobs)) as s:
+            save_csv(jobs, args.csv); s.out = len(jobs)
+        print(f"[OK] CSV written to {args.csv}")
+    if args.parquet:
+        with METRICS.stage("save_parquet", len(jobs)) as s:
+            save_parquet(jobs, args.parquet); s.out = len(jobs)
+        print(f"[OK] Parquet written to {args.parquet}")
+    return jobs
+
+def run_pipeline(jobs: List[Job], args: argparse.Namespace, console: Console, include_c: List[str],
+                 exclude_c: List[str], store: Optional[JobStore], sig_cache: Optional[SignatureCache] = None) -> List[Job]:
+    """dedupe -> geo/recency -> filters+score -> best --max, over already collected jobs."""
+    with METRICS.stage("dedupe", len(jobs)) as s:
+        jobs = dedupe(jobs, fuzzy=not args.no_fuzzy_dedupe, sig_cache=sig_cache); s.out = len(jobs)
+    console.print(f"After dedupe: {len(jobs)}")
+    with METRICS.stage("filter_geography_and_recency", len(jobs)) as s:
+        jobs = filter_geography_and_recency(jobs, include_c, exclude_c, None if args.days == 0 else args.days)
+        s.out = len(jobs)
     console.print(f"After geo/date: {len(jobs)}")
 
-    jobs = apply_filters_and_score(jobs, min_keep_score=args.min_score, loose=args.loose, strict=args.strict, console=console)
+    with METRICS.stage("apply_filters_and_score", len(jobs)) as s:
+        jobs = apply_filters_and_score(jobs, min_keep_score=args.min_score, loose=args.loose, strict=args.strict, console=console,
+                                       store=store, rescore_all=args.full, workers=args.workers)
+        s.out = len(jobs)
     console.print(f"After SE filters+score: {len(jobs)}")
 
-    # Sort by score then recency
-    jobs.sort(key=lambda j: ((j.score or 0), j.posted_at or ""), reverse=True)
-
-    if args.max and len(jobs) > args.max:
-        jobs = jobs[:args.max]
+    # Best --max by score then recency
+    jobs = TopK(args.max, rank_key).extend(jobs).items()
     console.print(f"[dim]Final: {len(jobs)}[/dim]")
+    return jobs
 
+def write_outputs(jobs: List[Job], args: argparse.Namespace) -> None:
     if args.csv:
-        save_csv(jobs, args.csv); print(f"[OK] CSV written to {args.csv}")
+        with METRICS.stage("save_csv", len(jobs)) as s:
+            save_csv(jobs, args.csv); s.out = len(jobs)
+        print(f"[OK] CSV written to {args.csv}")
     if args.json:
-        save_json(jobs, args.json); print(f"[OK] JSON written to {args.json}")
-
-    if args.print or not (args.csv or args.json):
-        if jobs:
-            console.print(as_table(jobs)); console.print(f"\n[dim]{len(jobs)} jobs shown.[/dim]")
-        else:
-            console.print("[yellow]No jobs to show. Try --loose or lower --min-score.[/yellow]")
-
+        with METRICS.stage("save_json", len(jobs)) as s:
+            save_json(jobs, args.json); s.out = len(jobs)
+        print(f"[OK] JSON written to {args.json}")
+    if args.parquet:
+        with METRICS.stage("save_parquet", len(jobs)) as s:
+            save_parquet(jobs, args.parquet); s.out = len(jobs)
+        print(f"[OK] Parquet written to {args.parquet}")
+
+def email_digest(jobs: List[Job], args: argparse.Namespace, console: Console, store: Optional[JobStore]) -> None:
     enable_email = args.email or _env_bool("ENABLE_EMAIL", False)
+    if enable_email and store is not None and not args.full:
+        before = len(jobs)
+        jobs = store.pending_email(jobs)
+        console.print(f"[dim]Email delta: {len(jobs)} new/changed of {before}[/dim]")
     if enable_email and jobs:
         Path("./data").mkdir(exist_ok=True)
         batch_size = int(os.getenv("EMAIL_BATCH_SIZE","100"))
@@ -735,80 +1602,246 @@ def main() -> int:
             scores = [c.score or 0 for c in chunk]
             score_avg = (sum(scores)//len(scores)) if scores else 0
             subject = build_subject(score_avg, len(chunk), idx, len(batches))
-            send_email_with_attachment(subject, body, str(batch_path))
+            with METRICS.stage("email", len(chunk)) as s:
+                send_email_with_attachment(subject, body, str(batch_path)); s.out = len(chunk)
+            if store is not None:
+                store.mark_emailed(chunk)
             if delay_s and idx < len(batches): time.sleep(delay_s)
     elif enable_email and not jobs:
         print("[WARN] Email enabled but there are 0 jobs. Skipping email.")
 
-    return 0
-
-if __name__ == "__main__":
-    raise SystemExit(main())
-NO_ARCHITECT = False  # set from --no-architect
+def write_run_report(args: argparse.Namespace, console: Console) -> None:
+    console.print(f"[dim]Timings: {METRICS.summary()}[/dim]")
+    report = METRICS.report()
+    if args.report:
+        METRICS.write_json(args.report, report); print(f"[OK] Run report written to {args.report}")
+    if args.prom:
+        METRICS.write_prometheus(args.prom, report); print(f"[OK] Metrics written to {args.prom}")
+
+# ===================== Daemon (--serve) =====================
+# Default refresh interval per provider; override with --schedule "remoteok=15m,greenhouse=1h"
+SERVE_SCHEDULE = os.getenv("AP_SERVE_SCHEDULE", "remotive=15m,remoteok=15m,greenhouse=1h,lever=1h,smartrecruiters=1h")
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$", re.I)
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_schedule(spec: str) -> Dict[str, float]:
+    """'remoteok=15m,greenhouse=1h' -> {provider: seconds}; a bare duration applies to every provider."""
+    out: Dict[str, float] = {}
+    for part in (p.strip() for p in spec.split(",") if p.strip()):
+        name, _, dur = part.rpartition("=")
+        m = _DURATION_RE.match(dur)
+        if not m:
+            raise ValueError(f"bad schedule entry: {part!r}")
+        seconds = float(m.group(1)) * _DURATION_UNITS[m.group(2).lower()]
+        known = [p.name for p in PROVIDERS]
+        if name and name.strip() not in known:
+            raise ValueError(f"unknown provider {name.strip()!r} in schedule entry {part!r} (known: {', '.join(known)})")
+        for p in ([name.strip()] if name else known):
+            out[p] = seconds
+    return out
 
-def fetch_smartrecruiters(companies_file: Path | str = None) -> List[Job]:
+def serve_schedule(override: str = "") -> Dict[str, float]:
+    """AP_SERVE_SCHEDULE with the --schedule entries applied on top."""
+    schedule = parse_schedule(SERVE_SCHEDULE)
+    schedule.update(parse_schedule(override))
+    return schedule
+
+def _fingerprint(items: Iterable[Any]) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for item in items:
+        h.update(repr(item).encode("utf-8")); h.update(b"\0")
+    return h.hexdigest()
+
+class Daemon:
+    """Resident collector for --serve.
+
+    One event loop and one pooled HttpSession live for the whole process, so connections,
+    compiled matchers, the geo cache and the MinHash signature cache stay warm. Each
+    provider is refetched on its own interval; the pipeline re-runs only when some
+    provider's postings changed, and outputs are written only when the final result
+    (ids, scores, content hashes) changed; with a store, the email delta runs on every publish.
     """
-    Collect postings from SmartRecruiters per-company JSON endpoint.
-    Company slugs are read from a newline-delimited file.
+    def __init__(self, args: argparse.Namespace, console: Console, keywords: List[str], include_c: List[str],
+                 exclude_c: List[str], cache: Optional[HttpCache], store: Optional[JobStore]):
+        self.args, self.console, self.keywords = args, console, keywords
+        self.include_c, self.exclude_c, self.cache, self.store = include_c, exclude_c, cache, store
+        schedule = serve_schedule(args.schedule)
+        self.providers = [p for p in PROVIDERS if p.name in schedule]
+        if not self.providers:
+            raise ValueError("serve schedule names no providers")
+        self.schedule = schedule
+        self.sig_cache = SignatureCache()
+        self.latest: Dict[str, List[Job]] = {}
+        self._provider_fp: Dict[str, str] = {}
+        self._result_fp: Optional[str] = None
+        self.cycles = 0
+
+    async def refresh(self, p: BaseProvider, session: HttpSession) -> bool:
+        """Refetch one provider; True when its postings changed since the last fetch."""
+        try:
+            with METRICS.provider(p.name) as fetched:
+                raw = load_fixture(self.args.replay, p.name) if self.args.replay else await p.bind(session).afetch(self.keywords)
+                fetched.out = len(raw)
+            with METRICS.stage(f"parse:{p.name}", len(raw)) as parsed:
+                jobs = normalize_jobs(p.to_jobs(raw), self.args.desc_max)
+                parsed.out = len(jobs)
+        except Exception as e:
+            log.warning(f"[WARN] {p.name} failed: {e}")
+            return False  # keep serving the previous postings
+        fp = _fingerprint(sorted((j.id, content_hash(j)) for j in jobs))
+        if fp == self._provider_fp.get(p.name):
+            return False
+        live = {j.id for j in jobs}
+        for old in self.latest.get(p.name, ()):
+            if old.id not in live:
+                DESCRIPTIONS.discard(old.id)
+        self._provider_fp[p.name], self.latest[p.name] = fp, jobs
+        log.info(f"[+] {p.name}: {len(jobs)} (changed)")
+        return True
+
+    def publish(self) -> None:
+        """Snapshot, filter and score the merged postings; called after some provider changed."""
+        jobs = [j for p in self.providers for j in self.latest.get(p.name, ())]
+        if self.args.snapshot:  # pre-filter, like run_search: --from-snapshot readers see the live postings
+            with METRICS.stage("save_snapshot", len(jobs)) as s:
+                save_snapshot(jobs, self.args.snapshot, self.keywords); s.out = len(jobs)
+        jobs = run_pipeline(jobs, self.args, self.console, self.include_c, self.exclude_c, self.store, self.sig_cache)
+        fp = _fingerprint((j.id, j.score, content_hash(j)) for j in jobs)
+        if fp != self._result_fp:
+            self._result_fp = fp
+            write_outputs(jobs, self.args)
+            if self.args.print:
+                print_jobs(jobs, self.console)
+        else:
+            self.console.print("[dim]Result unchanged; outputs left as they are[/dim]")
+            if self.store is None or self.args.full:
+                return  # no emailed markers to diff against: re-sending would repeat the last digest
+        # Store-backed delta runs every time: it picks up anything a failed send left unmarked
+        email_digest(jobs, self.args, self.console, self.store)
+
+    async def run(self) -> None:
+        args = self.args
+        due = {p.name: 0.0 for p in self.providers}
+        async with new_session(args.concurrency, args.per_host, cache=self.cache, host_rate=args.host_rate,
+                               retry_budget=args.retry_budget) as session:
+            while True:
+                now = time.monotonic()
+                ready = [p for p in self.providers if due[p.name] <= now]
+                if ready:
+                    METRICS.reset()
+                    METRICS.meta.update(argv=sys.argv[1:], mode="serve", cycle=self.cycles, providers=[p.name for p in ready])
+                    session.retry.spent = 0.0  # the retry budget is per cycle
+                    changed = await asyncio.gather(*(self.refresh(p, session) for p in ready))
+                    for p in ready:
+                        due[p.name] = now + self.schedule[p.name]
+                    if any(changed):
+                        self.publish()
+                    write_run_report(args, self.console)
+                    self.cycles += 1
+                    if args.serve_cycles and self.cycles >= args.serve_cycles:
+                        return
+                await asyncio.sleep(max(0.0, min(due.values()) - time.monotonic()))
+
+def serve(args: argparse.Namespace, console: Console, keywords: List[str], include_c: List[str],
+          exclude_c: List[str], cache: Optional[HttpCache], store: Optional[JobStore]) -> None:
+    daemon = Daemon(args, console, keywords, include_c, exclude_c, cache, store)
+    plan = ", ".join(f"{p.name}={daemon.schedule[p.name]:.0f}s" for p in daemon.providers)
+    console.print(f"[dim]Serving: {plan}[/dim]")
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        console.print("[dim]Stopped.[/dim]")
+
+def print_jobs(jobs: List[Job], console: Console) -> None:
+    if isinstance(console, PlainConsole):  # tables need the real thing
+        from rich.console import Console
+        console = Console(file=console.file)
+    if jobs:
+        console.print(as_table(jobs)); console.print(f"\n[dim]{len(jobs)} jobs shown.[/dim]")
+    else:
+        console.print("[yellow]No jobs to show. Try --loose or lower --min-score.[/yellow]")
+
+def _csv_list(s: Optional[str]) -> List[str]:
+    return [x.strip() for x in (s or "").split(",") if x.strip()]
+
+def run_search(args: argparse.Namespace, console: Console,
+               progress: Optional[Callable[[str, int], None]] = None) -> List[Job]:
+    """One collect -> filter -> score -> outputs/email run; what main() does without --serve.
+
+    Also the in-process entry point for the dashboard: `progress` is forwarded to collect_jobs.
     """
-    file_path = Path(companies_file or os.getenv("SMARTRECRUITERS_FILE", "./data/smartrecruiters_companies.txt"))
-    jobs: List[Job] = []
+    global SCORE_BACKEND
+    SCORE_BACKEND = args.score_backend
+    rules = use_rules(args.rules)
+    keywords = _csv_list(args.keywords) or list(rules.keywords)
+    include_c, exclude_c = _csv_list(args.include_countries), _csv_list(args.exclude_countries)
 
-#         return jobs  # patched: stray top-level return
+    METRICS.reset()
+    METRICS.meta.update(argv=sys.argv[1:], providers=[p.name for p in PROVIDERS], workers=args.workers,
+                        loose=args.loose, strict=args.strict, min_score=args.min_score, days=args.days,
+                        rules=rules.name, rules_digest=rules.digest)
 
+    console.print(f"[dim]Collecting with providers={len(PROVIDERS)}[/dim]")
+    cache = HttpCache(args.http_cache, ttl=args.cache_ttl) if args.http_cache else None
+    store = JobStore(args.store) if args.store else None
     try:
-        lines = [ln.strip() for ln in file_path.read_text(encoding="utf-8").splitlines()]
-        slugs = [ln for ln in lines if ln and not ln.startswith("#")]
-    except Exception as e:
-        logger.warning(f"[smartrecruiters] could not read {file_path}: {e}")
-        slugs = []
+        if args.from_snapshot:
+            with METRICS.stage("load_snapshot") as s:
+                jobs, meta = load_snapshot(args.from_snapshot, args.desc_max); s.out = len(jobs)
+            console.print(f"Snapshot: {len(jobs)} jobs fetched {meta.get('created_at', '?')}")
+            jobs = run_pipeline(jobs, args, console, include_c, exclude_c, store)
+            write_outputs(jobs, args)
+        elif args.stream:
+            jobs = run_stream(args, console, keywords, include_c, exclude_c, cache, store)
+        else:
+            with METRICS.stage("collect_jobs") as s:
+                jobs = collect_jobs(keywords, max_concurrency=args.concurrency, per_host=args.per_host, cache=cache,
+                                    desc_max=args.desc_max, record=args.record or None, replay=args.replay or None,
+                                    host_rate=args.host_rate, retry_budget=args.retry_budget, progress=progress)
+                s.out = len(jobs)
+            console.print(f"Collected: {len(jobs)}")
+            if args.snapshot:
+                with METRICS.stage("save_snapshot", len(jobs)) as s:
+                    save_snapshot(jobs, args.snapshot, keywords); s.out = len(jobs)
+            jobs = run_pipeline(jobs, args, console, include_c, exclude_c, store)
+            write_outputs(jobs, args)
+
+        if args.print or not (args.csv or args.json or args.parquet):
+            print_jobs(jobs, console)
+
+        email_digest(jobs, args, console, store)
+    finally:
+        if store is not None:
+            store.close()
+
+    write_run_report(args, console)
+    return jobs
 
-    if not slugs:
-        logger.info("[+] smartrecruiters: 0 (no company slugs)")
-#         return jobs  # patched: stray top-level return
+def main() -> int:
+    args = parse_args()
+    setup_logging(rich=args.print)
+    if args.print:
+        from rich.console import Console
+        console = Console()
+    else:
+        console = PlainConsole()
+    if not args.serve:
+        run_search(args, console)
+        return 0
 
-    headers = {"User-Agent": USER_AGENT}
-    client = httpx.Client(headers=headers, timeout=REQUEST_TIMEOUT)
-    for slug in slugs:
-        url = f"https://api.smartrecruiters.com/v1/companies/{slug}/postings?limit=100"
-        try:
-            r = client.get(url)
-            if r.status_code != 200:
-                logger.debug(f"[smartrecruiters] {slug} -> {r.status_code}")
-                continue
-            data = r.json()
-            for item in data.get("content", []):
-                title = (item.get("name") or "").strip()
-                ref = item.get("ref", {}) or {}
-                link = ref.get("jobAdUrl") or ref.get("uri") or f"https://www.smartrecruiters.com/{slug}/{item.get('id','')}"
-                dstr = item.get("releasedDate") or item.get("createdOn")
-                posted_at = None
-                if dstr:
-                    try:
-                        posted_at = dtparse.parse(dstr).date()
-                    except Exception:
-                        posted_at = None
-                loc = item.get("location") or {}
-                city = loc.get("city") or ""
-                country = (loc.get("country") or {}).get("code") if isinstance(loc.get("country"), dict) else (loc.get("country") or "")
-                location = ", ".join([p for p in [city, country] if p]).strip(", ")
-                company = (item.get("company") or {}).get("identifier") or slug
-                desc = None
-                jobad = item.get("jobAd") or {}
-                sections = jobad.get("sections") or {}
-                jd = sections.get("jobDescription") or {}
-                desc = jd.get("text") or None
-
-                jobs.append(Job(
-                    title=title, company=company, location=location,
-                    posted_at=posted_at, url=link, description=desc,
-                    source="smartrecruiters", tags=[]
-                ))
-        except Exception as e:
-            logger.debug(f"[smartrecruiters] {slug} fetch error: {e}")
+    global SCORE_BACKEND
+    SCORE_BACKEND = args.score_backend
+    rules = use_rules(args.rules)
 
-    logger.info(f"[+] smartrecruiters: {len(jobs)}")
-#     return jobs  # patched: stray top-level return
+    cache = HttpCache(args.http_cache, ttl=args.cache_ttl) if args.http_cache else None
+    store = JobStore(args.store) if args.store else None
+    try:
+        serve(args, console, _csv_list(args.keywords) or list(rules.keywords), _csv_list(args.include_countries),
+              _csv_list(args.exclude_countries), cache, store)
+    finally:
+        if store is not None:
+            store.close()
+    return 0
 
-def fetch_smartrecruiters_jobs(lines):
-    return Job.fetch_smartrecruiters_jobs(lines)
+if __name__ == "__main__":
+    raise SystemExit(main())
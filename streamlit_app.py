@@ -1,91 +1,192 @@
-import os, subprocess, shlex, time, pathlib
+# Streamlit dashboard for ApplyPilot
+# - Runs the pipeline in-process (applypilot_ux.run_search) on a background thread: no venv bootstrap or cold start per search
+# - Per-provider progress is streamed into the page while the worker runs
+# - Runs are cached per parameter set (st.cache_resource); result frames per file path + mtime (st.cache_data),
+#   so reruns from sorting/filtering never re-read or re-scrape
+# - "Re-score last fetch" re-runs dedupe/filters/scoring on the saved snapshot (--from-snapshot), no network
+# - "Rule set" picks the scoring profile (rules/*.toml, --rules); editing the file re-keys cached runs
+# - pandas loads with the first result frame; the pipeline logs through a plain console (no rich)
+from __future__ import annotations
+
+import hashlib, io, os, pathlib, threading, time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
 import streamlit as st
-import pandas as pd
+
+import applypilot_ux as ap
+from ap_rules import available_rules
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 PROJECT_DIR = pathlib.Path(__file__).resolve().parent
-BOOTSTRAP = PROJECT_DIR / "se_bootstrap.sh"
-DATA_CSV  = PROJECT_DIR / "data" / "filtered_jobs.csv"
+RUN_TTL_S = int(os.getenv("AP_DASHBOARD_RUN_TTL", "900"))  # identical searches within this window reuse the last run
+_RUN_LOCK = threading.Lock()  # METRICS, DESCRIPTIONS and NO_ARCHITECT are process-wide: one pipeline run at a time
+
+def _project_path(p: str) -> pathlib.Path:
+    path = pathlib.Path(p)
+    return path if path.is_absolute() else PROJECT_DIR / path
+
+ap.setup_logging()
+_DEFAULTS = ap.parse_args([])  # same env/.env-driven defaults as the CLI
+DATA_CSV = _project_path(_DEFAULTS.csv or "./data/se_filtered_jobs.csv")
+DATA_JSON = _project_path(_DEFAULTS.json) if _DEFAULTS.json else None
+SNAPSHOT = _project_path(_DEFAULTS.snapshot or ap.SNAPSHOT_PATH)
+RUNS_DIR = DATA_CSV.parent / "dashboard"
+
+@dataclass
+class PipelineRun:
+    """One in-process search; the worker thread only writes plain attributes the page polls."""
+    argv: List[str]
+    no_architect: bool
+    parquet: pathlib.Path
+    providers: Dict[str, Optional[int]] = field(default_factory=dict)  # None while a provider is still fetching
+    started: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    n_jobs: int = 0
+    log: str = ""
+    error: Optional[BaseException] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def start(self) -> "PipelineRun":
+        self.providers = {p.name: None for p in ap.PROVIDERS}
+        threading.Thread(target=self._work, name="applypilot-run", daemon=True).start()
+        return self
+
+    def _progress(self, provider: str, n: int) -> None:
+        self.providers[provider] = n
+
+    def _work(self) -> None:
+        buf = io.StringIO()
+        try:
+            with _RUN_LOCK:
+                ap.NO_ARCHITECT = self.no_architect
+                args = ap.parse_args(self.argv)
+                self.n_jobs = len(ap.run_search(args, ap.PlainConsole(buf), progress=self._progress))
+        except BaseException as e:  # argparse errors surface as SystemExit
+            self.error = e
+        finally:
+            self.log = buf.getvalue()
+            self.finished = time.time()
 
-st.set_page_config(page_title="ApplyPilot Ultra — SE/SC Finder", layout="wide")
+@st.cache_resource(ttl=RUN_TTL_S, max_entries=8, show_spinner=False)
+def start_run(argv: Tuple[str, ...], no_architect: bool, snapshot_mtime: float = 0.0, rules_mtime: float = 0.0) -> PipelineRun:
+    """`snapshot_mtime` keys --from-snapshot runs on the snapshot they read; `rules_mtime` on the rule file's version."""
+    key = hashlib.blake2b(repr((argv, no_architect, snapshot_mtime, rules_mtime)).encode("utf-8"), digest_size=8).hexdigest()
+    parquet = RUNS_DIR / f"{key}.parquet"
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    full = [*argv, "-o", str(DATA_CSV), "--json", str(DATA_JSON or ""), "--parquet", str(parquet), "--snapshot", str(SNAPSHOT)]
+    return PipelineRun(full, no_architect, parquet).start()
 
-st.title("ApplyPilot Ultra — SE/SC Finder")
-st.caption("Minimal GUI wrapper for your existing pipeline")
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_results(path: str, mtime: float) -> pd.DataFrame:
+    """Result frame for a run output; `mtime` is only part of the cache key."""
+    if path.endswith(".parquet"):
+        return ap.load_parquet(path)
+    import pandas as pd
+    return pd.read_csv(path)
+
+def _frame(path: pathlib.Path) -> Optional[pd.DataFrame]:
+    try:
+        return load_results(str(path), path.stat().st_mtime)
+    except FileNotFoundError:
+        return None
+
+def show_progress(run: PipelineRun) -> None:
+    total = len(run.providers) or 1
+    bar, table = st.progress(0.0, text="Collecting jobs…"), st.empty()
+    while True:
+        done = sum(n is not None for n in run.providers.values())
+        table.dataframe([{"provider": k, "jobs": "…" if n is None else n} for k, n in run.providers.items()],
+                        hide_index=True)
+        if run.done:
+            bar.progress(1.0, text=f"Done in {run.finished - run.started:.1f}s — {run.n_jobs} jobs kept")
+            return
+        bar.progress(done / total * 0.9, text=f"Collecting jobs… {done}/{total} providers"
+                     if done < total else "Filtering and scoring…")
+        time.sleep(0.25)
+
+def show_results(df: pd.DataFrame, source: pathlib.Path) -> None:
+    c1, c2, c3 = st.columns([2, 1, 2])
+    query = c1.text_input("Search title / company", value="")
+    floor = c2.number_input("Score ≥", min_value=0, max_value=100, value=0, step=5)
+    sources = c3.multiselect("Sources", sorted(df["source"].dropna().unique()) if "source" in df else [])
+    view = df
+    if query:
+        q = query.lower()
+        view = view[view["title"].str.lower().str.contains(q, regex=False, na=False)
+                    | view["company"].str.lower().str.contains(q, regex=False, na=False)]
+    if floor and "score" in view:
+        view = view[view["score"].fillna(0) >= floor]
+    if sources:
+        view = view[view["source"].isin(sources)]
+    st.caption(f"{len(view)} of {len(df)} jobs from {source}")
+    st.dataframe(view, width="stretch", hide_index=True)
+    if DATA_CSV.exists():
+        st.download_button("Download CSV", DATA_CSV.read_bytes(), file_name=DATA_CSV.name, mime="text/csv")
+
+st.set_page_config(page_title=f"ApplyPilot Ultra — {ap.RULES.role_family}", layout="wide")
+
+st.title(f"ApplyPilot Ultra — {ap.RULES.role_family}")
+st.caption("Runs the ApplyPilot pipeline in-process")
 
 with st.form("controls", clear_on_submit=False):
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        keywords = st.text_input("Keywords (comma or space separated)", 
-                                 value="sales engineer, solutions engineer, solutions consultant, pre-sales, presales, technical sales engineer, technical account manager, customer engineer, implementation engineer, field applications engineer, solutions architect, value engineer")
-        include_countries = st.text_input("Include countries (CSV, optional)", value="")
+        rule_files = [str(p) for p in available_rules()]
+        rules = st.selectbox("Rule set", rule_files, format_func=lambda p: pathlib.Path(p).stem,
+                             index=rule_files.index(ap.RULES.path) if ap.RULES.path in rule_files else 0)
+        keywords = st.text_input("Keywords (comma separated; blank = the rule set's)", value="")
+        include_countries = st.text_input("Include countries (CSV, optional)", value=_DEFAULTS.include_countries)
         exclude_countries = st.text_input("Exclude countries (CSV, optional)", value="")
 
     with col2:
         days = st.number_input("Days back", min_value=1, max_value=365, value=30, step=1)
-        max_jobs = st.number_input("Max to collect", min_value=10, max_value=5000, value=150, step=10)
+        max_jobs = st.number_input("Max to keep", min_value=10, max_value=5000, value=150, step=10)
         min_score = st.slider("Min score", min_value=0, max_value=100, value=45, step=1)
 
     with col3:
         loose = st.checkbox("Loose mode", value=True)
         strict = st.checkbox("Strict mode", value=False)
         no_arch = st.checkbox("Drop Architect-heavy titles", value=True)
-        do_print = st.checkbox("Print table to console", value=True)
         do_email = st.checkbox("Send email", value=False)
+        refresh = st.checkbox("Re-fetch even if this search ran recently", value=False)
+        rescore = st.checkbox("Re-score last fetch (no network)", value=False, disabled=not SNAPSHOT.exists(),
+                              help="Re-runs dedupe, filters and scoring on the jobs saved by the last search")
 
     submitted = st.form_submit_button("Run Search")
 
-# Build and run the command when submitted
 if submitted:
-    if not BOOTSTRAP.exists():
-        st.error(f"Bootstrap script not found: {BOOTSTRAP}")
-        st.stop()
-
-    # Assemble CLI
-    args = [str(BOOTSTRAP)]
-    if do_print: args.append("--print")
-    if do_email: args.append("--email")
-    args += ["--max", str(max_jobs), "--days", str(days), "--min-score", str(min_score)]
-    if loose:  args.append("--loose")
-    if strict: args.append("--strict")
-    # keywords / include / exclude are optional flags in your script; pass only if provided
-    if keywords.strip():
-        args += ["-k", keywords.strip()]
-    if include_countries.strip():
-        args += ["--include-countries", include_countries.strip()]
-    if exclude_countries.strip():
-        args += ["--exclude-countries", exclude_countries.strip()]
-
-    # Environment: enable architect suppression via env (works even if CLI flag isn’t present)
-    env = os.environ.copy()
-    env["NO_ARCHITECT"] = "1" if no_arch else "0"
-
-    st.write("**Command**:", " ".join(shlex.quote(a) for a in args))
-    with st.spinner("Collecting jobs…"):
-        try:
-            # Stream logs to the UI
-            proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
-            log_lines = []
-            log_area = st.empty()
-            for line in iter(proc.stdout.readline, ""):
-                log_lines.append(line.rstrip("\n"))
-                # Throttle updates a bit for performance
-                if len(log_lines) % 5 == 0:
-                    log_area.code("\n".join(log_lines[-400:]), language="bash")
-            proc.wait()
-            log_area.code("\n".join(log_lines[-400:]), language="bash")
-            if proc.returncode != 0:
-                st.error(f"Pipeline exited with code {proc.returncode}. See logs above.")
-        except Exception as e:
-            st.exception(e)
-
-    # Load and show results if present
-    if DATA_CSV.exists():
-        try:
-            df = pd.read_csv(DATA_CSV)
-            st.success(f"Loaded {len(df)} jobs from {DATA_CSV}")
-            st.dataframe(df, use_container_width=True)
-            st.download_button("Download CSV", df.to_csv(index=False).encode("utf-8"), file_name="filtered_jobs.csv", mime="text/csv")
-        except Exception as e:
-            st.warning(f"Could not read CSV: {e}")
-    else:
-        st.info("No CSV found yet; check the logs for details.")
+    argv = ["--max", str(max_jobs), "--days", str(days), "--min-score", str(min_score),
+            "--rules", rules, "-k", keywords.strip(), "--include-countries", include_countries.strip(),
+            "--exclude-countries", exclude_countries.strip()]
+    if loose:    argv.append("--loose")
+    if strict:   argv.append("--strict")
+    if do_email: argv.append("--email")
+    snapshot_mtime = 0.0
+    if rescore and SNAPSHOT.exists():
+        argv += ["--from-snapshot", str(SNAPSHOT)]
+        snapshot_mtime = SNAPSHOT.stat().st_mtime
+    elif refresh:
+        start_run.clear()
+    st.session_state["run"] = start_run(tuple(argv), no_arch, snapshot_mtime, pathlib.Path(rules).stat().st_mtime)
+
+run: Optional[PipelineRun] = st.session_state.get("run")
+if run is not None:
+    show_progress(run)
+    if run.error is not None:
+        st.error(f"Pipeline failed: {run.error!r}")
+    with st.expander("Run log"):
+        st.code(run.log or "(no output)", language="text")
+
+source = run.parquet if run is not None and run.error is None else DATA_CSV
+df = _frame(source)
+if df is not None:
+    show_results(df, source)
+else:
+    st.info("No results yet; run a search.")